@@ -1,17 +1,182 @@
+import asyncio
+import math
+from contextlib import asynccontextmanager
+from typing import List, Optional
 from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from src.constants import APP_HOST,APP_PORT
-from src.pipline.prediction_pipeline import PredictionPipeline, SpotifyData  
-from uvicorn import run as app_run
-app = FastAPI()
+from pydantic import BaseModel, Field, ValidationError
+from src.constants import APP_HOST,APP_PORT,PREDICTION_BATCH_MAX_RECORDS,PREDICTION_STREAM_CHUNK_ROWS,PREDICTION_STREAM_MAX_LINE_BYTES,PREDICTION_REQUEST_VALIDATION
+from src.entity.config_entity import ModelReloaderConfig, SpotifyHitPredictorConfig
+from src.exception import MyException, ServiceOverloadedException
+from src.logger import logging
+from src.pipline.prediction_pipeline import PredictionPipeline, SpotifyBatch, SpotifyData, score_batch, score_records
+from src.pipline.batch_coalescer import PredictionCoalescer
+from src.pipline.inference_executor import InferenceExecutor
+from src.pipline.model_reloader import ModelReloader
+from src.pipline.prefork_server import is_prefork_worker, serve
+from src.pipline.request_validator import RequestValidator
+from src.pipline.shadow_scoring import ShadowScorer
+from src.pipline.stream_scoring import StreamScorer, UploadStreamingResponse
+from src.pipline import wire_formats
+from src.utils.metrics import STAGE_LATENCY, RequestLatencyMiddleware, render_metrics
+
+# Model calls run on a bounded pool so they never block the event loop
+executor = InferenceExecutor()
+
+# Compares a challenger model with the champion on sampled traffic, when one is configured
+shadow_scorer: Optional[ShadowScorer] = None
+
+
+async def score_live(fn, records):
+    """
+    Scores records on the executor and hands them to the shadow scorer afterwards.
+    """
+    result = await executor.run(fn, records)
+    if shadow_scorer is not None:
+        shadow_scorer.submit(records)
+    return result
+
+
+# Concurrent /predict requests are gathered into micro-batches and scored together
+coalescer = PredictionCoalescer(predict_batch=lambda records: score_live(score_records, records))
+
+
+# schema.yaml rules, compiled once and checked on every prediction request
+request_validator = RequestValidator.from_schema(SpotifyBatch.feature_names) if PREDICTION_REQUEST_VALIDATION else None
+
+
+def validation_errors(features, location: list) -> list:
+    """
+    Runs the schema rules over a batch of feature rows and returns FastAPI-style 422
+    error details. `location` prefixes each error's loc; a None entry in it is
+    replaced by the row index.
+    """
+    if request_validator is None:
+        return []
+    with STAGE_LATENCY.time("validation"):
+        errors = request_validator.validate(features)
+    return [
+        {
+            "type": "value_error",
+            "loc": [row if part is None else part for part in location] + [field],
+            "msg": f"{field} {message}",
+            "input": value if math.isfinite(value) else None,
+        }
+        for row, field, message, value in errors
+    ]
+
+
+# Readiness is reported by /readyz once the model is loaded and warmed up
+serving_state = {"ready": False, "detail": "model warm-up not started"}
+
+# Hot-swaps newly pushed models; created once the first model is warm
+reloader: Optional[ModelReloader] = None
+
+
+async def warm_up_model(spotify_prediction_config: SpotifyHitPredictorConfig = SpotifyHitPredictorConfig()):
+    """
+    Loads and warms the model off the event loop, retrying until it succeeds. The
+    executor pool is started afterwards so process workers fork with the model loaded,
+    followed by the reloader that watches S3 for newly pushed models. Under the
+    pre-fork server the master has already loaded and warmed the model, so workers
+    skip straight to serving with the shared copy; the master also handles reloads,
+    so the workers' reloaders stay disabled.
+    """
+    global reloader, shadow_scorer
+    serving_state["detail"] = "warming up"
+    while PredictionPipeline.model is None or PredictionPipeline.model.loaded_model is None:
+        try:
+            await asyncio.to_thread(PredictionPipeline().warm_up, spotify_prediction_config)
+            break
+        except Exception as e:
+            serving_state["detail"] = f"warm-up failed, retrying: {e}"
+            logging.error(f"Model warm-up failed, retrying in {spotify_prediction_config.warmup_retry_seconds}s.")
+            await asyncio.sleep(spotify_prediction_config.warmup_retry_seconds)
+    executor.start()
+    serving_state.update(ready=True, detail="ok")
+    reloader_config = ModelReloaderConfig()
+    if is_prefork_worker():
+        reloader_config.enabled = False
+    reloader = ModelReloader(PredictionPipeline.model, reloader_config=reloader_config,
+                             spotify_prediction_config=spotify_prediction_config, on_swap=executor.recycle)
+    await reloader.start()
+    if PredictionPipeline.challenger is not None:
+        shadow_scorer = ShadowScorer(PredictionPipeline.model, PredictionPipeline.challenger,
+                                     spotify_prediction_config=spotify_prediction_config)
+        shadow_scorer.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await coalescer.start()
+    warm_up_task = asyncio.create_task(warm_up_model())
+    yield
+    warm_up_task.cancel()
+    if reloader is not None:
+        await reloader.stop()
+    await coalescer.stop()
+    if shadow_scorer is not None:
+        shadow_scorer.shutdown()
+    executor.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RequestLatencyMiddleware)
+
+
+@app.exception_handler(ServiceOverloadedException)
+async def overloaded_handler(request: Request, exc: ServiceOverloadedException):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after_seconds)},
+    )
 
 # Static + Templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
 
+class SpotifyTrack(BaseModel):
+    """
+    JSON body for a single track. Field names match SpotifyData.
+    """
+    uri: Optional[str] = None
+    danceability: float
+    energy: float
+    key: int
+    loudness: float
+    mode: int
+    speechiness: float
+    acousticness: float
+    instrumentalness: float
+    liveness: float
+    valence: float
+    tempo: float
+    duration_ms: int
+    time_signature: int
+    chorus_hit: float
+    sections: int
+
+
+class BatchPredictionRequest(BaseModel):
+    tracks: List[SpotifyTrack] = Field(..., min_length=1, max_length=PREDICTION_BATCH_MAX_RECORDS)
+
+
+class TrackPrediction(BaseModel):
+    uri: Optional[str] = None
+    label: int
+    hit_probability: float
+
+
+class BatchPredictionResponse(BaseModel):
+    count: int
+    predictions: List[TrackPrediction]
+
+
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
@@ -37,21 +202,145 @@ async def predict(
     sections: int = Form(...)
 ):
     # Create data object
-    data = SpotifyData(
-        danceability, energy, key, loudness, mode,
-        speechiness, acousticness, instrumentalness,
-        liveness, valence, tempo, duration_ms,
-        time_signature, chorus_hit, sections
-    )
+    with STAGE_LATENCY.time("request_parsing"):
+        data = SpotifyData(
+            danceability, energy, key, loudness, mode,
+            speechiness, acousticness, instrumentalness,
+            liveness, valence, tempo, duration_ms,
+            time_signature, chorus_hit, sections
+        )
 
-    # Run prediction
-    pipeline = PredictionPipeline()
-    prediction = pipeline.predict(data)
+    errors = validation_errors(data.values(), ["body"])
+    if errors:
+        result = "Invalid input: " + "; ".join(error["msg"] for error in errors)
+        return templates.TemplateResponse(
+            "index.html", {"request": request, "result": result}, status_code=422
+        )
+
+    # Run prediction (batched with other in-flight requests)
+    prediction, _ = await coalescer.submit(data)
 
     result = "🎵 Likely a Hit Song!" if prediction == 1 else "❌ Not a Hit"
     print(result)
     return templates.TemplateResponse(
         "index.html", {"request": request, "result": result}
     )
+
+BATCH_REQUEST_CONTENT = {
+    "application/json": {"schema": {"title": "BatchPredictionRequest", "type": "object"}},
+    wire_formats.ARROW_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}},
+    wire_formats.MSGPACK_MEDIA_TYPES[0]: {"schema": {"type": "string", "format": "binary"}},
+}
+
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse,
+          openapi_extra={"requestBody": {"content": BATCH_REQUEST_CONTENT, "required": True}})
+async def predict_batch(request: Request):
+    # The whole batch is scored through one preprocessing + model call;
+    # tracks already in the prediction cache are not rescored.
+    # Bodies and responses are JSON by default; Arrow IPC or msgpack are chosen
+    # by the Content-Type and Accept headers.
+    request_format = wire_formats.negotiate(request.headers.get("content-type"))
+    response_format = wire_formats.negotiate(request.headers.get("accept"))
+    body = await request.body()
+
+    with STAGE_LATENCY.time("request_parsing"):
+        try:
+            if request_format == "arrow":
+                batch, uris = wire_formats.decode_arrow(body)
+            elif request_format == "msgpack":
+                batch, uris = wire_formats.decode_msgpack(body)
+            else:
+                tracks = BatchPredictionRequest.model_validate_json(body).tracks
+                batch = SpotifyBatch.from_records([track.model_dump() for track in tracks])
+                uris = [track.uri for track in tracks]
+        except ValidationError as e:
+            raise RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in e.errors()])
+        except wire_formats.UnsupportedFormatError as e:
+            return JSONResponse(status_code=415, content={"detail": str(e)})
+        except ValueError as e:
+            return JSONResponse(status_code=422, content={"detail": str(e)})
+        except MyException as e:
+            # The wrapped message carries file paths and line numbers, so it stays in the log
+            logging.warning(f"Rejected {request_format} batch body: {e}")
+            return JSONResponse(status_code=422, content={"detail": "Batch features could not be read as tracks."})
+
+    if not 0 < len(batch) <= PREDICTION_BATCH_MAX_RECORDS:
+        return JSONResponse(status_code=422, content={"detail": f"Batch must hold 1 to {PREDICTION_BATCH_MAX_RECORDS} tracks."})
+    errors = validation_errors(batch.to_array(), ["body", "tracks", None])
+    if errors:
+        return JSONResponse(status_code=422, content={"detail": errors})
+    labels, probabilities = await score_live(score_records, batch)
+
+    try:
+        if response_format == "arrow":
+            return Response(wire_formats.encode_arrow(uris, labels, probabilities), media_type=wire_formats.ARROW_MEDIA_TYPE)
+        if response_format == "msgpack":
+            return Response(wire_formats.encode_msgpack(uris, labels, probabilities), media_type=wire_formats.MSGPACK_MEDIA_TYPES[0])
+    except wire_formats.UnsupportedFormatError as e:
+        return JSONResponse(status_code=406, content={"detail": str(e)})
+
+    uris = uris if uris is not None else [None] * len(labels)
+    predictions = [
+        TrackPrediction(uri=uri, label=int(label), hit_probability=float(probability))
+        for uri, label, probability in zip(uris, labels, probabilities)
+    ]
+    return BatchPredictionResponse(count=len(predictions), predictions=predictions)
+
+
+async def score_upload_chunk(dataframe):
+    # An upload is a long-running job rather than an interactive request, so when the
+    # executor sheds load the chunk waits and retries instead of failing the stream
+    while True:
+        try:
+            return await score_live(score_batch, dataframe)
+        except ServiceOverloadedException as e:
+            await asyncio.sleep(e.retry_after_seconds)
+
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request):
+    # CSV (text/csv) or NDJSON (application/x-ndjson) upload, scored and streamed back in chunks
+    is_ndjson = "json" in request.headers.get("content-type", "")
+    scorer = StreamScorer(request.stream(), "ndjson" if is_ndjson else "csv",
+                          score_chunk=score_upload_chunk, chunk_rows=PREDICTION_STREAM_CHUNK_ROWS,
+                          validator=request_validator, max_line_bytes=PREDICTION_STREAM_MAX_LINE_BYTES)
+    try:
+        await scorer.start()
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"detail": str(e)})
+    # The body is still being read while results are sent, so the response must not consume receive()
+    return UploadStreamingResponse(scorer.results(), media_type="application/x-ndjson" if is_ndjson else "text/csv")
+
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    status_code = 200 if serving_state["ready"] else 503
+    return JSONResponse(status_code=status_code, content=serving_state)
+
+
+@app.get("/predict/stats")
+async def predict_stats():
+    cache = PredictionPipeline.cache
+    return {
+        "coalescer": coalescer.stats(),
+        "executor": executor.stats(),
+        "cache": cache.stats() if cache is not None else None,
+        "reloader": reloader.stats() if reloader is not None else None,
+        "shadow": shadow_scorer.stats() if shadow_scorer is not None else None,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
-    app_run(app, host=APP_HOST, port=APP_PORT)
\ No newline at end of file
+    serve(app, host=APP_HOST, port=APP_PORT)
\ No newline at end of file
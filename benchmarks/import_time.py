@@ -0,0 +1,144 @@
+"""
+Measures serving cold start: how long `import app` takes (with the slowest modules
+from `python -X importtime`) and how long a fresh uvicorn process needs before it
+answers /healthz and /readyz.
+
+Run from the repository root:
+
+    python benchmarks/import_time.py --runs 5 --top 15
+    python benchmarks/import_time.py --skip-server
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+def measure_import(module: str) -> tuple:
+    """
+    Imports `module` in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: (seconds to import `module`, {module: cumulative seconds} for every imported module)
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        _, cumulative_us, name = match.groups()
+        cumulative[name] = int(cumulative_us) / 1e6
+    return cumulative[module], cumulative
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, deadline: float, process: subprocess.Popen) -> float:
+    """
+    Polls `url` until it answers 200 and returns the time at which it did.
+    """
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with code {process.returncode} before {url} answered")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return time.monotonic()
+        except (urllib.error.URLError, ConnectionError, TimeoutError):
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} did not answer 200 in time")
+
+
+def measure_server(timeout: float) -> tuple:
+    """
+    Starts `uvicorn app:app` on a free port.
+
+    Returns:
+        tuple: (seconds until /healthz answers, seconds until /readyz answers or None on timeout)
+    """
+    port = free_port()
+    start = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = start + timeout
+        healthy = wait_for(f"http://127.0.0.1:{port}/healthz", deadline, process) - start
+        try:
+            ready = wait_for(f"http://127.0.0.1:{port}/readyz", deadline, process) - start
+        except TimeoutError:
+            # readiness needs the model from S3, which may not be reachable here
+            ready = None
+        return healthy, ready
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app", help="module to import (default: app)")
+    parser.add_argument("--runs", type=int, default=3, help="repetitions; the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="slowest modules to list")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the server")
+    parser.add_argument("--skip-server", action="store_true", help="only measure the import")
+    args = parser.parse_args()
+
+    totals = []
+    slowest = {}
+    for _ in range(args.runs):
+        total, cumulative = measure_import(args.module)
+        totals.append(total)
+        for name, seconds in cumulative.items():
+            slowest.setdefault(name, []).append(seconds)
+
+    print(f"import {args.module}: median {statistics.median(totals) * 1000:.0f} ms "
+          f"(min {min(totals) * 1000:.0f} ms, {args.runs} runs)")
+    print("slowest modules by cumulative import time (median):")
+    medians = sorted(((statistics.median(s), name) for name, s in slowest.items()), reverse=True)
+    for seconds, name in medians[:args.top]:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+
+    if args.skip_server:
+        return
+
+    healthy, ready = [], []
+    for _ in range(args.runs):
+        healthy_seconds, ready_seconds = measure_server(args.timeout)
+        healthy.append(healthy_seconds)
+        if ready_seconds is not None:
+            ready.append(ready_seconds)
+
+    print(f"first /healthz response: median {statistics.median(healthy) * 1000:.0f} ms")
+    if ready:
+        print(f"first /readyz response:  median {statistics.median(ready) * 1000:.0f} ms")
+    else:
+        print("first /readyz response:  not ready within the timeout (is the model reachable?)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmarks SpotifyData.export_collection_as_dataframe with a single cursor against
+the parallel `_id`-range export, on a scratch collection of synthetic tracks.
+
+Against a local mongod (the collection is created and dropped again):
+
+    python benchmarks/mongo_export.py --mongodb-url mongodb://localhost:27017 --rows 500000 --workers 1 2 4
+
+Without --mongodb-url (and no MONGODB_URL set) it uses an in-memory mongomock
+client, which forked worker processes inherit. mongomock is much slower than mongod
+and pure Python, so it shows the scaling of the decode/convert work rather than
+realistic absolute numbers.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCHMARK_COLLECTION = "spotifydata_export_benchmark"
+
+
+def synthetic_tracks(rows: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    features = {
+        "danceability": rng.random(rows), "energy": rng.random(rows), "key": rng.integers(0, 12, rows),
+        "loudness": rng.uniform(-60, 0, rows), "mode": rng.integers(0, 2, rows),
+        "speechiness": rng.random(rows), "acousticness": rng.random(rows),
+        "instrumentalness": rng.random(rows), "liveness": rng.random(rows), "valence": rng.random(rows),
+        "tempo": rng.uniform(50, 200, rows), "duration_ms": rng.integers(60000, 400000, rows),
+        "time_signature": rng.integers(3, 6, rows), "chorus_hit": rng.uniform(0, 120, rows),
+        "sections": rng.integers(1, 30, rows), "target": rng.integers(0, 2, rows),
+    }
+    columns = {name: values.tolist() for name, values in features.items()}
+    tracks = []
+    for i in range(rows):
+        track = {name: values[i] for name, values in columns.items()}
+        track.update(track=f"track {i}", artist=f"artist {i % 5000}", uri=f"spotify:track:{i:022d}")
+        if i % 500 == 0:
+            track["tempo"] = "na"
+        tracks.append(track)
+    return tracks
+
+
+def use_mongomock() -> None:
+    try:
+        import mongomock
+    except ImportError:
+        sys.exit("Pass --mongodb-url or install mongomock to run this benchmark.")
+    import src.configuration.mongo_db_connection as mongo_db_connection
+
+    # One in-memory server for the parent and, through fork, every worker process
+    shared_client = mongomock.MongoClient()
+    mongo_db_connection.pymongo.MongoClient = lambda *args, **kwargs: shared_client
+    os.environ.setdefault("MONGODB_URL", "mongodb://mongomock")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongodb-url", default=os.getenv("MONGODB_URL"), help="defaults to $MONGODB_URL, else mongomock")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=1, help="repetitions per worker count; the best is reported")
+    args = parser.parse_args()
+
+    if args.mongodb_url:
+        os.environ["MONGODB_URL"] = args.mongodb_url
+    else:
+        use_mongomock()
+
+    from src.data_access.spotify_data import SpotifyData
+
+    spotify_data = SpotifyData()
+    collection = spotify_data.mongo_client.database[BENCHMARK_COLLECTION]
+    collection.drop()
+    print(f"inserting {args.rows} synthetic tracks into {BENCHMARK_COLLECTION}...")
+    tracks = synthetic_tracks(args.rows)
+    for start in range(0, len(tracks), 50000):
+        collection.insert_many(tracks[start:start + 50000])
+    del tracks
+
+    try:
+        baseline = None
+        for workers in args.workers:
+            best = float("inf")
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                dataframe = spotify_data.export_collection_as_dataframe(
+                    collection_name=BENCHMARK_COLLECTION, batch_size=args.batch_size, workers=workers)
+                best = min(best, time.perf_counter() - start)
+            if len(dataframe) != args.rows:
+                raise RuntimeError(f"exported {len(dataframe)} rows, expected {args.rows}")
+            baseline = baseline or best
+            print(f"workers={workers}: {best:.2f} s, {args.rows / best:,.0f} rows/s, "
+                  f"speedup {baseline / best:.2f}x")
+    finally:
+        collection.drop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,109 @@
 import streamlit as st
-from src.pipline.prediction_pipeline import SpotifyData,PredictionPipeline
+import pandas as pd
+from src.pipline.prediction_pipeline import SpotifyBatch, SpotifyData, PredictionPipeline
+from src.pipline.request_validator import RequestValidator
+from src.utils.metrics import STAGE_LATENCY
 st.title("Spotify Tracks Classification")
 st.write("This is a simple Streamlit app for Spotify Tracks Classification.")
 import time
 
-dancebility = st.slider("Danceability", 0.0, 1.0, 0.5)
-energy = st.slider("Energy", 0.0, 1.0, 0.5)
-key = st.number_input("Key", min_value=0, max_value=11, value=5)
-loudness = st.number_input("Loudness", min_value=-60.0, max_value=0.0, value=-10.0)
-mode = st.selectbox("Mode", [0, 1], index=1)
-speechiness = st.slider("Speechiness", 0.0, 1.0, 0.5)
-acousticness = st.slider("Acousticness", 0.0, 1.0, 0.5)
-instrumentalness = st.slider("Instrumentalness", 0.0, 1.0, 0.5)
-liveness = st.slider("Liveness", 0.0, 1.0, 0.5)
-valence = st.slider("Valence", 0.0, 1.0, 0.5)
-tempo = st.number_input("Tempo", min_value=0.0, max_value=250.0, value=120.0)
-duration_ms = st.number_input("Duration (ms)", min_value=0, max_value=600000, value=210000)
-time_signature = st.number_input("Time Signature", min_value=0, max_value=7, value=4)
-chorus_hit = st.number_input("Chorus Hit", min_value=0.0, max_value=300.0, value=60.0)
-sections = st.number_input("Sections", min_value=1, max_value=50, value=8)
-test_song = SpotifyData(
-    danceability=dancebility,
-    energy=energy,
-    key=key,
-    loudness=loudness,
-    mode=mode,
-    speechiness=speechiness,
-    acousticness=acousticness,
-    instrumentalness=instrumentalness,
-    liveness=liveness,
-    valence=valence,
-    tempo=tempo,
-    duration_ms=duration_ms,
-    time_signature=time_signature,
-    chorus_hit=chorus_hit,
-    sections=sections
-)
-if st.button("Predict"):
-    prediction_pipeline=PredictionPipeline()
-    start_time = time.time()
-    status=prediction_pipeline.predict(test_song)
-    end_time = time.time()
-    st.write(f"Prediction completed in {end_time - start_time:.2f} seconds.")
-    if status==1:
-        st.success("The track is likely to be a hit!")
-    else:
-        st.warning("The track is less likely to be a hit.")
+
+@st.cache_resource
+def load_prediction_pipeline() -> PredictionPipeline:
+    # Loaded and warmed once per server process, shared by every session
+    prediction_pipeline = PredictionPipeline()
+    prediction_pipeline.warm_up()
+    return prediction_pipeline
+
+
+@st.cache_resource
+def load_request_validator() -> RequestValidator:
+    return RequestValidator.from_schema(SpotifyBatch.feature_names)
+
+
+def show_stage_timings(stage_timings) -> None:
+    # Time spent in each pipeline stage during this session's last call
+    timings = stage_timings.seconds
+    if timings:
+        st.table(pd.DataFrame({"stage": list(timings), "milliseconds": [seconds * 1000 for seconds in timings.values()]}))
+
+
+input_mode = st.radio("Input", ["Single track", "Batch CSV upload"], horizontal=True)
+
+if input_mode == "Single track":
+    dancebility = st.slider("Danceability", 0.0, 1.0, 0.5)
+    energy = st.slider("Energy", 0.0, 1.0, 0.5)
+    key = st.number_input("Key", min_value=0, max_value=11, value=5)
+    loudness = st.number_input("Loudness", min_value=-60.0, max_value=0.0, value=-10.0)
+    mode = st.selectbox("Mode", [0, 1], index=1)
+    speechiness = st.slider("Speechiness", 0.0, 1.0, 0.5)
+    acousticness = st.slider("Acousticness", 0.0, 1.0, 0.5)
+    instrumentalness = st.slider("Instrumentalness", 0.0, 1.0, 0.5)
+    liveness = st.slider("Liveness", 0.0, 1.0, 0.5)
+    valence = st.slider("Valence", 0.0, 1.0, 0.5)
+    tempo = st.number_input("Tempo", min_value=0.0, max_value=250.0, value=120.0)
+    duration_ms = st.number_input("Duration (ms)", min_value=0, max_value=600000, value=210000)
+    time_signature = st.number_input("Time Signature", min_value=0, max_value=7, value=4)
+    chorus_hit = st.number_input("Chorus Hit", min_value=0.0, max_value=300.0, value=60.0)
+    sections = st.number_input("Sections", min_value=1, max_value=50, value=8)
+    test_song = SpotifyData(
+        danceability=dancebility,
+        energy=energy,
+        key=key,
+        loudness=loudness,
+        mode=mode,
+        speechiness=speechiness,
+        acousticness=acousticness,
+        instrumentalness=instrumentalness,
+        liveness=liveness,
+        valence=valence,
+        tempo=tempo,
+        duration_ms=duration_ms,
+        time_signature=time_signature,
+        chorus_hit=chorus_hit,
+        sections=sections
+    )
+    if st.button("Predict"):
+        prediction_pipeline=load_prediction_pipeline()
+        start_time = time.time()
+        with STAGE_LATENCY.collect() as stage_timings:
+            status=prediction_pipeline.predict(test_song)
+        end_time = time.time()
+        st.write(f"Prediction completed in {end_time - start_time:.2f} seconds.")
+        show_stage_timings(stage_timings)
+        if status==1:
+            st.success("The track is likely to be a hit!")
+        else:
+            st.warning("The track is less likely to be a hit.")
+
+else:
+    uploaded_file = st.file_uploader("CSV laid out like config/schema.yaml", type="csv")
+    if uploaded_file is not None and st.button("Predict all"):
+        prediction_pipeline=load_prediction_pipeline()
+        start_time = time.time()
+        tracks = pd.read_csv(uploaded_file)
+        missing = [column for column in SpotifyBatch.feature_names if column not in tracks.columns]
+        if missing:
+            st.error(f"The file is missing feature columns: {missing}")
+            st.stop()
+
+        features = tracks[list(SpotifyBatch.feature_names)].apply(pd.to_numeric, errors="coerce")
+        errors = load_request_validator().validate(features.to_numpy(dtype=float))
+        if errors:
+            st.error(f"{len(errors)} invalid values, e.g. row {errors[0][0]}: {errors[0][1]} {errors[0][2]}.")
+            st.stop()
+
+        batch = SpotifyBatch.from_dataframe(features)
+
+        with STAGE_LATENCY.collect() as stage_timings:
+            labels, probabilities = prediction_pipeline.predict_records(batch)
+        end_time = time.time()
+        st.write(f"Prediction completed in {end_time - start_time:.2f} seconds for {len(batch)} tracks.")
+        show_stage_timings(stage_timings)
+
+        identifiers = [column for column in ("track", "artist", "uri") if column in tracks.columns]
+        results = tracks[identifiers].assign(label=labels, hit_probability=probabilities)
+        st.write(f"{int(results['label'].sum())} of {len(results)} tracks are likely hits.")
+        st.dataframe(results)
+        st.download_button("Download predictions", results.to_csv(index=False), file_name="predictions.csv",
+                           mime="text/csv")
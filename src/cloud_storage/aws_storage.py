@@ -1,13 +1,13 @@
-import boto3
 from src.configuration.aws_connection import S3Client
 from io import StringIO
-from typing import Union,List
+from typing import TYPE_CHECKING,Union,List
 import os,sys
 from src.logger import logging
-from mypy_boto3_s3.service_resource import Bucket
 from src.exception import MyException
-from botocore.exceptions import ClientError
 from pandas import DataFrame,read_csv
+
+if TYPE_CHECKING:
+    from mypy_boto3_s3.service_resource import Bucket
 import pickle
 
 class SimpleStorageService:
@@ -47,7 +47,7 @@ class SimpleStorageService:
             raise MyException(e,sys)
         
         
-    def get_bucket(self,bucket_name:str)->Bucket:
+    def get_bucket(self,bucket_name:str)->"Bucket":
         """
         Retrieves a bucket resource from S3.
 
@@ -138,6 +138,51 @@ class SimpleStorageService:
         except Exception as e:
             raise MyException(e, sys) from e
         
+    def get_object_version(self,key:str,bucket_name:str)->str:
+        """
+        Returns the current ETag of an S3 object with a HEAD request, without downloading it.
+
+        Args:
+            key (str): The key (path) of the object.
+            bucket_name (str): The name of the S3 bucket.
+
+        Returns:
+            str: The object's ETag (quotes stripped), which changes whenever the object is overwritten.
+        """
+        try:
+            response=self.s3_client.head_object(Bucket=bucket_name,Key=key)
+            return response["ETag"].strip('"')
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def get_object_bytes(self,key:str,bucket_name:str,if_none_match:str=None)->tuple:
+        """
+        Downloads one object by its exact key (no prefix listing), optionally as a conditional GET.
+
+        Args:
+            key (str): The key (path) of the object.
+            bucket_name (str): The name of the S3 bucket.
+            if_none_match (str, optional): ETag already held locally. If the object still has
+                                           this ETag, S3 answers 304 and nothing is downloaded.
+
+        Returns:
+            tuple: (content bytes, ETag), or (None, if_none_match) if the object is unchanged.
+        """
+        from botocore.exceptions import ClientError
+        try:
+            params={"Bucket":bucket_name,"Key":key}
+            if if_none_match:
+                params["IfNoneMatch"]=f'"{if_none_match}"'
+            try:
+                response=self.s3_client.get_object(**params)
+            except ClientError as e:
+                if e.response.get("Error",{}).get("Code") in ("304","NotModified"):
+                    return None,if_none_match
+                raise
+            return response["Body"].read(),response["ETag"].strip('"')
+        except Exception as e:
+            raise MyException(e, sys) from e
+
     def create_folder(self,folder_name:str,bucket_name:str)->None:
         """
         Creates a "folder" (a zero-byte object with a trailing slash) in an S3 bucket.
@@ -147,6 +192,7 @@ class SimpleStorageService:
             bucket_name (str): The name of the S3 bucket.
         """
         logging.info(f"Entered the create_folder method of SimpleStorageService class. Creating folder '{folder_name}' in bucket '{bucket_name}'.")
+        from botocore.exceptions import ClientError
         try:
             folder_obj=folder_name+"/"
             self.s3_client.put_object(Bucket=bucket_name, Key=folder_obj)
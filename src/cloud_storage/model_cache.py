@@ -0,0 +1,102 @@
+import hashlib
+import os
+import re
+from typing import Optional
+
+from src.entity.config_entity import ModelCacheConfig
+from src.logger import logging
+
+
+class LocalModelCache:
+    """
+    Content-addressed on-disk cache of one S3 model object, keyed by its ETag.
+
+    Each cached version is stored as `<etag>.pkl` next to a `<etag>.sha256` checksum
+    written after the pickle. A file whose checksum is missing or wrong (e.g. a torn
+    write or disk corruption) is discarded and never loaded.
+    """
+
+    def __init__(self, bucket_name: str, key: str, cache_config: ModelCacheConfig = ModelCacheConfig()):
+        """
+        Args:
+            bucket_name (str): S3 bucket of the model object.
+            key (str): S3 key of the model object.
+            cache_config (ModelCacheConfig): Cache directory and retention settings.
+        """
+        self.cache_config = cache_config
+        object_id = hashlib.sha256(f"{bucket_name}/{key}".encode()).hexdigest()[:16]
+        self.directory = os.path.join(cache_config.cache_dir, object_id)
+
+    def _path(self, version: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9_-]", "_", version) + ".pkl")
+
+    def latest_version(self) -> Optional[str]:
+        """
+        Returns the ETag of the most recently cached version, or None if the cache is empty.
+        """
+        if not os.path.isdir(self.directory):
+            return None
+        cached = [name for name in os.listdir(self.directory)
+                  if name.endswith(".pkl") and os.path.exists(os.path.join(self.directory, name[:-4] + ".sha256"))]
+        if not cached:
+            return None
+        latest = max(cached, key=lambda name: os.path.getmtime(os.path.join(self.directory, name)))
+        return latest[:-4]
+
+    def read(self, version: str) -> Optional[bytes]:
+        """
+        Returns the cached bytes of `version` if present and intact, else None.
+        """
+        path = self._path(version)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            with open(path[:-4] + ".sha256") as f:
+                expected = f.read().strip()
+        except OSError:
+            return None
+
+        if hashlib.sha256(content).hexdigest() != expected:
+            logging.warning(f"Checksum mismatch for cached model {path}. Discarding it.")
+            self._remove(version)
+            return None
+        return content
+
+    def write(self, version: str, content: bytes) -> None:
+        """
+        Stores `content` under `version` and prunes older versions.
+
+        Raises:
+            ValueError: If `version` is a single-part ETag (the object's MD5) that does not
+                        match `content`, i.e. the download was corrupted.
+        """
+        if re.fullmatch(r"[0-9a-f]{32}", version) and hashlib.md5(content).hexdigest() != version:
+            raise ValueError(f"Downloaded model does not match its ETag {version}.")
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(version)
+        # Write to a temp file and rename, so readers never see a partial pickle
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        with open(tmp_path, "w") as f:
+            f.write(hashlib.sha256(content).hexdigest())
+        os.replace(tmp_path, path[:-4] + ".sha256")
+        logging.info(f"Cached model version {version} at {path}.")
+        self._prune(keep=version)
+
+    def _remove(self, version: str) -> None:
+        path = self._path(version)
+        for file_path in (path, path[:-4] + ".sha256"):
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+
+    def _prune(self, keep: str) -> None:
+        versions = [name[:-4] for name in os.listdir(self.directory) if name.endswith(".pkl")]
+        versions.sort(key=lambda v: os.path.getmtime(os.path.join(self.directory, v + ".pkl")), reverse=True)
+        stale = [v for v in versions if v != keep][self.cache_config.keep_versions:]
+        for version in stale:
+            self._remove(version)
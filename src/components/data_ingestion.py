@@ -1,5 +1,6 @@
 import os
 import sys
+import json
 import pandas as pd
 import numpy as np
 from src.logger import logging
@@ -8,7 +9,11 @@ from src.entity.config_entity import DataIngestionConfig
 from src.entity.artifact_entity import DataIngestionArtifact
 from sklearn.model_selection import train_test_split
 from src.constants import *
-from src.data_access.spotify_data import SpotifyData
+from src.data_access.spotify_data import ColumnBuffers, SpotifyData
+from src.data_access.ingestion_store import PartitionedDatasetStore
+from src.utils.main_utils import read_yaml_file, write_data_frame
+from src.entity.compiled_schema import load_compiled_schema, memory_report
+from src.utils.hash_split import ChunkWriter, split_file_by_hash
 
 
 class DataIngestion:
@@ -47,6 +52,86 @@ class DataIngestion:
         logging.info("Fetching data from server (method not implemented yet).")
         pass
 
+    def export_incrementally(self, spotifydata: SpotifyData) -> pd.DataFrame:
+        """
+        Updates the persistent partitioned store (see update_ingestion_store) and returns
+        the whole stored dataset.
+
+        Args:
+            spotifydata (SpotifyData): Connection used to query MongoDB.
+
+        Returns:
+            pd.DataFrame: Every document ingested so far.
+        """
+        logging.info("Entered export_incrementally method of DataIngestion class.")
+        try:
+            return self.update_ingestion_store(spotifydata).load()
+        except Exception as e:
+            logging.error("Error occurred during incremental ingestion.")
+            raise MyException(e, sys) from e
+
+    def update_ingestion_store(self, spotifydata: SpotifyData) -> PartitionedDatasetStore:
+        """
+        Pulls only the documents added since the previous run into the persistent
+        partitioned store. Each run re-reads `overlap_seconds` of `_id` time behind the
+        watermark so late writes are not skipped; the store drops the documents it
+        already holds.
+
+        The first run, or a run with `full_refresh`, pulls the entire collection.
+
+        Args:
+            spotifydata (SpotifyData): Connection used to query MongoDB.
+
+        Returns:
+            PartitionedDatasetStore: The updated store.
+        """
+        try:
+            store = PartitionedDatasetStore(self.data_ingestion_config.store_dir)
+            if self.data_ingestion_config.full_refresh:
+                store.clear()
+
+            watermark = store.read_watermark()
+            logging.info(f"Ingestion store has {watermark['rows']} rows up to _id {watermark['last_id']}.")
+
+            new_documents, last_id = spotifydata.export_documents_after(
+                watermark["last_id"],
+                overlap_seconds=self.data_ingestion_config.overlap_seconds,
+                batch_size=self.data_ingestion_config.mongo_export_batch_size
+            )
+            store.append(new_documents, last_id)
+            logging.info(f"Ingestion store now holds {store.read_watermark()['rows']} rows.")
+            return store
+
+        except Exception as e:
+            logging.error("Error occurred while updating the ingestion store.")
+            raise MyException(e, sys) from e
+
+    def compact_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Casts the exported data to the compact dtypes compiled from schema.yaml and writes
+        a memory report with the bytes per row before and after.
+
+        Args:
+            df (pd.DataFrame): The exported data.
+
+        Returns:
+            pd.DataFrame: The same data with compact dtypes.
+        """
+        try:
+            compact_df = load_compiled_schema().apply(df)
+            report = memory_report(df, compact_df)
+            logging.info(f"Compact dtypes: {report['bytes_per_row_before']} -> {report['bytes_per_row_after']} "
+                         f"bytes per row for {report['rows']} rows.")
+
+            os.makedirs(os.path.dirname(self.data_ingestion_config.memory_report_file_path), exist_ok=True)
+            with open(self.data_ingestion_config.memory_report_file_path, "w") as report_file:
+                json.dump(report, report_file, indent=4)
+            return compact_df
+
+        except Exception as e:
+            logging.error("Error occurred while compacting dtypes.")
+            raise MyException(e, sys) from e
+
     def split_data_into_train_test(self, df: pd.DataFrame) -> None:
         """
         Splits the given DataFrame into training and testing sets and saves them as CSV files.
@@ -74,8 +159,9 @@ class DataIngestion:
             logging.info(f"Created directory: {dir_name} (if not already present).")
 
             # Save the training and testing data to CSV files
-            train_set.to_csv(self.data_ingestion_config.data_ingestion_train_file_path, index=False, header=True)
-            test_set.to_csv(self.data_ingestion_config.data_ingestion_test_file_path, index=False, header=True)
+            csv_export = self.data_ingestion_config.csv_export
+            write_data_frame(train_set, self.data_ingestion_config.data_ingestion_train_file_path, csv_export)
+            write_data_frame(test_set, self.data_ingestion_config.data_ingestion_test_file_path, csv_export)
 
             # Log the paths where the data was saved
             logging.info(f"Training data saved at {self.data_ingestion_config.data_ingestion_train_file_path}.")
@@ -86,11 +172,85 @@ class DataIngestion:
             logging.error("Error occurred while splitting data into train/test.")
             raise MyException(e, sys) from e
 
+    def split_data_by_hash(self) -> None:
+        """
+        Streams the saved raw data into train and test files, assigning each track by a
+        stable hash of its uri (optionally stratified on the target), so the split itself
+        needs memory only for one chunk and tracks keep their side of the split across runs.
+        """
+        logging.info("Entered split_data_by_hash method of DataIngestion class.")
+        try:
+            config = self.data_ingestion_config
+            stratify_column = read_yaml_file(SCHEMA_FILE_PATH)["target_column"][0] if config.split_stratify else None
+            logging.info(f"Hash-splitting on '{config.split_key_column}' with test size {config.train_test_split_ratio}"
+                         f"{f', stratified on {stratify_column}' if stratify_column else ''}.")
+
+            train_rows, test_rows = split_file_by_hash(
+                config.data_ingestion_raw_data_file,
+                config.data_ingestion_train_file_path,
+                config.data_ingestion_test_file_path,
+                test_ratio=config.train_test_split_ratio,
+                key_column=config.split_key_column,
+                stratify_column=stratify_column,
+                chunk_rows=config.split_chunk_rows,
+                csv_export=config.csv_export,
+            )
+            logging.info(f"Hash split wrote {train_rows} training rows to {config.data_ingestion_train_file_path} "
+                         f"and {test_rows} testing rows to {config.data_ingestion_test_file_path}.")
+
+        except Exception as e:
+            logging.error("Error occurred while hash-splitting data into train/test.")
+            raise MyException(e, sys) from e
+
+    def write_raw_data_in_chunks(self, spotifydata: SpotifyData) -> int:
+        """
+        Writes the raw data file chunk by chunk for the hash split: batches exported from
+        MongoDB, or read back from the ingestion store in incremental mode, are appended
+        to the file as they arrive, so memory use depends on the batch size rather than
+        the size of the collection. The collection is read with a single cursor
+        (`mongo_export_workers` does not apply), and incremental runs still hold the newly
+        pulled documents while they are added to the store.
+
+        Rows keep the export dtypes (float64 for numeric columns). Compact dtypes depend on
+        whole columns, so they are applied when the files are read back, and no memory
+        report is written in this mode.
+
+        Args:
+            spotifydata (SpotifyData): Connection used to query MongoDB.
+
+        Returns:
+            int: Rows written.
+        """
+        logging.info("Entered write_raw_data_in_chunks method of DataIngestion class.")
+        try:
+            config = self.data_ingestion_config
+            if config.incremental:
+                chunks = self.update_ingestion_store(spotifydata).iter_chunks(config.split_chunk_rows)
+            else:
+                chunks = spotifydata.iter_collection_frames(batch_size=config.mongo_export_batch_size)
+
+            column_types = read_yaml_file(SCHEMA_FILE_PATH)["columns"]
+            writer = ChunkWriter(config.data_ingestion_raw_data_file, config.csv_export,
+                                 schema=ColumnBuffers.arrow_schema(column_types))
+            for chunk in chunks:
+                writer.write(chunk)
+            writer.close(pd.DataFrame(columns=list(column_types)))
+            logging.info(f"Wrote {writer.rows} rows to {config.data_ingestion_raw_data_file}.")
+            return writer.rows
+
+        except Exception as e:
+            logging.error("Error occurred while writing raw data in chunks.")
+            raise MyException(e, sys) from e
+
     def initiate_data_ingestion(self) -> DataIngestionArtifact:
         """
         Initiates the data ingestion process by reading raw data from MongoDB,
         saving it, splitting it, and returning the paths as a DataIngestionArtifact.
 
+        With the hash split the data is streamed from MongoDB to the raw file and on to
+        the train and test files, never held in memory as a whole. The random split
+        exports the collection into one compact DataFrame and splits it in memory.
+
         Returns:
             DataIngestionArtifact: An artifact object with paths to the training and testing data.
         """
@@ -98,35 +258,49 @@ class DataIngestion:
         try:
             # Create a SpotifyData object to fetch data from MongoDB
             spotifydata = SpotifyData()
-            # Export the collection to a DataFrame
-            df = spotifydata.export_collection_as_dataframe()
+            if self.data_ingestion_config.split_mode == "hash":
+                self.write_raw_data_in_chunks(spotifydata)
+                self.split_data_by_hash()
+                return self._artifact()
+
+            # Export the collection to a DataFrame, or only its new documents in incremental mode
+            if self.data_ingestion_config.incremental:
+                df = self.export_incrementally(spotifydata)
+            else:
+                df = spotifydata.export_collection_as_dataframe(
+                    batch_size=self.data_ingestion_config.mongo_export_batch_size,
+                    workers=self.data_ingestion_config.mongo_export_workers
+                )
             logging.info("Successfully fetched raw data from MongoDB.")
+            df = self.compact_dtypes(df)
 
             # Create the directory for raw data storage
             raw_dir = os.path.dirname(self.data_ingestion_config.data_ingestion_raw_data_file)
             os.makedirs(raw_dir, exist_ok=True)
             
             # Save the raw data to a CSV file
-            df.to_csv(self.data_ingestion_config.data_ingestion_raw_data_file, index=False, header=True)
+            write_data_frame(df, self.data_ingestion_config.data_ingestion_raw_data_file,
+                             self.data_ingestion_config.csv_export)
             logging.info(f"Raw data loaded and saved at {self.data_ingestion_config.data_ingestion_raw_data_file}.")
 
             # Call the method to split the data
             self.split_data_into_train_test(df)
-
-            # Create the DataIngestionArtifact object with the file paths
-            data_ingestion_artifact = DataIngestionArtifact(
-                raw_file_path=self.data_ingestion_config.data_ingestion_raw_data_file,
-                train_file_path=self.data_ingestion_config.data_ingestion_train_file_path,
-                test_file_path=self.data_ingestion_config.data_ingestion_test_file_path
-            )
-
-            # Log the completion of the process and the artifact details
-            logging.info("Data Ingestion process completed successfully.")
-            logging.info(f"Data Ingestion Artifact: {data_ingestion_artifact}.")
-
-            return data_ingestion_artifact
+            return self._artifact()
 
         except Exception as e:
             # Log the error and raise a custom exception
             logging.error("Error occurred during initiate_data_ingestion process.")
-            raise MyException(e, sys)
\ No newline at end of file
+            raise MyException(e, sys)
+
+    def _artifact(self) -> DataIngestionArtifact:
+        # Create the DataIngestionArtifact object with the file paths
+        data_ingestion_artifact = DataIngestionArtifact(
+            raw_file_path=self.data_ingestion_config.data_ingestion_raw_data_file,
+            train_file_path=self.data_ingestion_config.data_ingestion_train_file_path,
+            test_file_path=self.data_ingestion_config.data_ingestion_test_file_path
+        )
+
+        # Log the completion of the process and the artifact details
+        logging.info("Data Ingestion process completed successfully.")
+        logging.info(f"Data Ingestion Artifact: {data_ingestion_artifact}.")
+        return data_ingestion_artifact
\ No newline at end of file
@@ -5,7 +5,8 @@ from src.exception import MyException
 from src.logger import logging
 from src.entity.config_entity import DataTransformationConfig
 from src.entity.artifact_entity import DataIngestionArtifact,DataValidationArtifact,DataTransformationArtifact
-from src.utils.main_utils import read_yaml_file
+from src.utils.main_utils import read_yaml_file, read_data_frame
+from src.entity.compiled_schema import load_compiled_schema
 import pickle 
 from src.constants import *
 from sklearn.pipeline import Pipeline
@@ -59,23 +60,18 @@ class DataTransformation:
         except Exception as e:
             raise MyException(e,sys)
         
-    def save_trasformed_data_and_object(self,train_df:pd.DataFrame,test_df:pd.DataFrame)->None:
+    def get_data_transformer_object(self)->ColumnTransformer:
         """
-        Applies transformations to the data, saves the transformed data as numpy arrays,
-        and saves the preprocessor object using pickle.
-        
-        Args:
-            train_df (pd.DataFrame): The training DataFrame.
-            test_df (pd.DataFrame): The testing DataFrame.
+        Builds the (unfitted) preprocessor: standard scaling for the numerical features
+        and one-hot encoding for the categorical features listed in the schema.
+
+        Returns:
+            ColumnTransformer: The preprocessor object.
         """
         try:
-            logging.info("Splitting data into features and target.")
             numerical_features=self._schema_config["numerical_features"]
             categorical_features=self._schema_config["categorical_features"]
-            
-            X_train,y_train=train_df.drop(self._schema_config["target_column"],axis=1),train_df[self._schema_config["target_column"]]
-            X_test,y_test=test_df.drop(self._schema_config["target_column"],axis=1),test_df[self._schema_config["target_column"]]
-            
+
             # Creating preprocessing pipelines for numerical and categorical features
             logging.info("Creating preprocessing pipelines.")
             numeric_transformer = Pipeline(steps=[
@@ -88,10 +84,28 @@ class DataTransformation:
             ])
 
             # Creating ColumnTransformer to apply pipelines to respective columns
-            preprocessor=ColumnTransformer(transformers=[
+            return ColumnTransformer(transformers=[
             ("num", numeric_transformer, numerical_features),
             ("cat", categorical_transformer, categorical_features)
             ],remainder="passthrough")
+        except Exception as e:
+            raise MyException(e,sys)
+
+    def save_trasformed_data_and_object(self,train_df:pd.DataFrame,test_df:pd.DataFrame)->None:
+        """
+        Applies transformations to the data, saves the transformed data as numpy arrays,
+        and saves the preprocessor object using pickle.
+        
+        Args:
+            train_df (pd.DataFrame): The training DataFrame.
+            test_df (pd.DataFrame): The testing DataFrame.
+        """
+        try:
+            logging.info("Splitting data into features and target.")
+            X_train,y_train=train_df.drop(self._schema_config["target_column"],axis=1),train_df[self._schema_config["target_column"]]
+            X_test,y_test=test_df.drop(self._schema_config["target_column"],axis=1),test_df[self._schema_config["target_column"]]
+            
+            preprocessor=self.get_data_transformer_object()
             
             # Fitting and transforming the data
             logging.info("Fitting preprocessor on training data and transforming both train and test data.")
@@ -128,7 +142,8 @@ class DataTransformation:
         """
         try:
             logging.info(f"Loading data from {file_path}")
-            df=pd.read_csv(file_path)
+            # Stored compact; widened to the float64/int64 dtypes the serving path uses
+            df=load_compiled_schema().model_inputs(read_data_frame(file_path))
             logging.info("Data loaded successfully.")
             return df
         except Exception as e:
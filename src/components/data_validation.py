@@ -1,5 +1,6 @@
 import os,sys
-from src.utils.main_utils import read_yaml_file
+from src.utils.main_utils import read_yaml_file, read_data_frame
+from src.entity.compiled_schema import load_compiled_schema
 from src.entity.config_entity import DataValidationConfig
 from src.entity.artifact_entity import DataValidationArtifact
 from src.entity.artifact_entity import DataIngestionArtifact
@@ -91,7 +92,7 @@ class DataValidation:
         """
         try:
             logging.info(f"Loading data from {file_path}")
-            df=pd.read_csv(file_path)
+            df=load_compiled_schema().apply(read_data_frame(file_path))
             logging.info("Data loaded successfully.")
             return df
         except Exception as e:
@@ -9,7 +9,8 @@ from src.exception import MyException
 import numpy as np
 import pandas as pd
 from src.constants import SCHEMA_FILE_PATH
-from src.utils.main_utils import read_yaml_file
+from src.utils.main_utils import read_yaml_file, read_data_frame
+from src.entity.compiled_schema import load_compiled_schema
 class ModelEvaluation:
     """
     This class is responsible for evaluating the newly trained model against
@@ -38,7 +39,7 @@ class ModelEvaluation:
             
             
             logging.info("Loading transformed test data.")
-            test_df=pd.read_csv(self.data_ingestion_artifact.test_file_path)
+            test_df=load_compiled_schema().model_inputs(read_data_frame(self.data_ingestion_artifact.test_file_path))
             test_df.drop(columns=self._schema_config["columns_to_drop"],axis=1,inplace=True)
             self.X_test,self.y_test=test_df.drop(self._schema_config["target_column"],axis=1),test_df[self._schema_config["target_column"]]
             
@@ -1,4 +1,3 @@
-import boto3
 import os
 from src.constants import AWS_SECRET_ACCESS_KEY_ENV_KEY,AWS_ACCESS_KEY_ID_ENV_KEY,REGION_NAME
 from src.logger import logging
@@ -35,6 +34,9 @@ class S3Client:
                     raise Exception(f"Environment variable: {AWS_SECRET_ACCESS_KEY_ENV_KEY} is not set.")
                 logging.info(f"Successfully retrieved {AWS_SECRET_ACCESS_KEY_ENV_KEY}.")
             
+                # boto3 takes a noticeable share of startup; import it only when a client is needed
+                import boto3
+
                 logging.info("Creating S3 resource.")
                 S3Client.s3_resource=boto3.resource(
                     "s3",
@@ -23,11 +23,17 @@ MODEL_BUCKET_NAME = "my-spotifymodel"
 MODEL_PUSHER_S3_KEY = "model-registry"
 
 #Data ingestion Constants
+# Format of the data artifacts passed between pipeline stages: "parquet", "feather" or "csv"
+DATA_ARTIFACT_FORMAT:str=os.getenv("DATA_ARTIFACT_FORMAT", "parquet")
+DATA_ARTIFACT_EXTENSION:str={"parquet": ".parquet", "feather": ".feather", "csv": ".csv"}[DATA_ARTIFACT_FORMAT]
+# "true" also writes a CSV copy next to each columnar artifact, for inspection or export
+DATA_ARTIFACT_CSV_EXPORT:bool=os.getenv("DATA_ARTIFACT_CSV_EXPORT", "false").lower() == "true"
 DATA_INGESTION_DIR_NAME="Data_ingestion"
-DATA_INGESTION_RAW_DATA_FILE="spotify.csv"
+DATA_INGESTION_RAW_DATA_FILE=f"spotify{DATA_ARTIFACT_EXTENSION}"
 DATA_INGESTION_INGESTED_DIR_NAME="ingested"
-TRAIN_FILE_NAME:str="train.csv"
-TEST_FILE_NAME:str="test.csv"
+DATA_INGESTION_MEMORY_REPORT_FILE_NAME="memory_report.json"
+TRAIN_FILE_NAME:str=f"train{DATA_ARTIFACT_EXTENSION}"
+TEST_FILE_NAME:str=f"test{DATA_ARTIFACT_EXTENSION}"
 TRAIN_TEST_SPLIT_RATIO:float=0.30
 
 
@@ -51,4 +57,59 @@ TRAINED_MODEL_REPORT_FILE:str="model_report.json"
 
 
 APP_HOST = "0.0.0.0"
-APP_PORT = 5000
\ No newline at end of file
+APP_PORT = 5000
+
+# Prediction serving constants
+PREDICTION_BATCH_MAX_RECORDS:int=10000
+PREDICTION_COALESCER_MAX_BATCH_SIZE:int=int(os.getenv("PREDICTION_COALESCER_MAX_BATCH_SIZE", 64))
+PREDICTION_COALESCER_MAX_WAIT_MS:float=float(os.getenv("PREDICTION_COALESCER_MAX_WAIT_MS", 5))
+PREDICTION_COALESCER_MAX_QUEUE_SIZE:int=int(os.getenv("PREDICTION_COALESCER_MAX_QUEUE_SIZE", 1024))
+INFERENCE_EXECUTOR_KIND:str=os.getenv("INFERENCE_EXECUTOR_KIND", "thread")  # "thread" or "process"
+INFERENCE_EXECUTOR_MAX_WORKERS:int=int(os.getenv("INFERENCE_EXECUTOR_MAX_WORKERS", 2))
+INFERENCE_EXECUTOR_MAX_PENDING:int=int(os.getenv("INFERENCE_EXECUTOR_MAX_PENDING", 16))
+INFERENCE_RETRY_AFTER_SECONDS:int=int(os.getenv("INFERENCE_RETRY_AFTER_SECONDS", 1))
+PREDICTION_WARMUP_ROWS:int=int(os.getenv("PREDICTION_WARMUP_ROWS", 8))
+PREDICTION_WARMUP_ROUNDS:int=int(os.getenv("PREDICTION_WARMUP_ROUNDS", 3))
+PREDICTION_WARMUP_RETRY_SECONDS:float=float(os.getenv("PREDICTION_WARMUP_RETRY_SECONDS", 10))
+PREDICTION_COMPILED_PREPROCESSOR:bool=os.getenv("PREDICTION_COMPILED_PREPROCESSOR", "false").lower() == "true"
+PREDICTION_FLAT_TREE_EVALUATOR:bool=os.getenv("PREDICTION_FLAT_TREE_EVALUATOR", "false").lower() == "true"
+PREDICTION_CACHE_ENABLED:bool=os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+PREDICTION_CACHE_MAX_ENTRIES:int=int(os.getenv("PREDICTION_CACHE_MAX_ENTRIES", 10000))
+PREDICTION_CACHE_TTL_SECONDS:float=float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", 3600))
+# Round float features to this many decimals before hashing; unset means exact match only
+PREDICTION_CACHE_FLOAT_DECIMALS=int(os.environ["PREDICTION_CACHE_FLOAT_DECIMALS"]) if os.getenv("PREDICTION_CACHE_FLOAT_DECIMALS") else None
+# Worker processes forked from one master that loads the model once (1 = single process)
+SERVING_WORKERS:int=int(os.getenv("SERVING_WORKERS", 1))
+MODEL_RELOAD_ENABLED:bool=os.getenv("MODEL_RELOAD_ENABLED", "true").lower() == "true"
+MODEL_RELOAD_POLL_SECONDS:float=float(os.getenv("MODEL_RELOAD_POLL_SECONDS", 60))
+MODEL_CACHE_ENABLED:bool=os.getenv("MODEL_CACHE_ENABLED", "true").lower() == "true"
+MODEL_CACHE_DIR:str=os.getenv("MODEL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "spotify-hit-predictor", "models"))
+# Older model versions kept on disk per model key, besides the one being served
+MODEL_CACHE_KEEP_VERSIONS:int=int(os.getenv("MODEL_CACHE_KEEP_VERSIONS", 2))
+# Rows parsed and scored per chunk by the streaming upload endpoint
+PREDICTION_STREAM_CHUNK_ROWS:int=int(os.getenv("PREDICTION_STREAM_CHUNK_ROWS", 5000))
+# Longest CSV/NDJSON line accepted in a streamed upload; a track row is a few hundred bytes
+PREDICTION_STREAM_MAX_LINE_BYTES:int=int(os.getenv("PREDICTION_STREAM_MAX_LINE_BYTES", 65536))
+# Enforce the schema.yaml rules (ranges, allowed categories) on prediction requests
+PREDICTION_REQUEST_VALIDATION:bool=os.getenv("PREDICTION_REQUEST_VALIDATION", "true").lower() == "true"
+# S3 key of a challenger model scored in the shadow of live traffic; unset disables shadow scoring
+SHADOW_CHALLENGER_MODEL_KEY:str=os.getenv("SHADOW_CHALLENGER_MODEL_KEY", "")
+SHADOW_SAMPLE_RATE:float=float(os.getenv("SHADOW_SAMPLE_RATE", 0.05))
+SHADOW_MAX_PENDING:int=int(os.getenv("SHADOW_MAX_PENDING", 4))
+# Documents fetched from MongoDB and converted to column arrays per round trip during ingestion
+MONGO_EXPORT_BATCH_SIZE:int=int(os.getenv("MONGO_EXPORT_BATCH_SIZE", 10000))
+# Incremental ingestion: pull only documents newer than the last run into a persistent local store
+DATA_INGESTION_INCREMENTAL:bool=os.getenv("DATA_INGESTION_INCREMENTAL", "false").lower() == "true"
+# "true" discards the store and re-pulls the whole collection
+DATA_INGESTION_FULL_REFRESH:bool=os.getenv("DATA_INGESTION_FULL_REFRESH", "false").lower() == "true"
+DATA_INGESTION_STORE_DIR:str=os.getenv("DATA_INGESTION_STORE_DIR", os.path.join(ARTIFACT_DIR, "ingestion_store"))
+# Seconds of _id time re-read behind the watermark each run, to catch documents inserted late
+# with smaller ObjectIds (clock skew, slow writers); re-read documents are deduplicated on _id
+DATA_INGESTION_OVERLAP_SECONDS:int=int(os.getenv("DATA_INGESTION_OVERLAP_SECONDS", 600))
+# Worker processes reading _id ranges of the collection in parallel during a full export (1 = single cursor)
+MONGO_EXPORT_WORKERS:int=int(os.getenv("MONGO_EXPORT_WORKERS", 1))
+# "random": train_test_split on the whole frame; "hash": streaming split by a stable hash of the track uri
+DATA_INGESTION_SPLIT_MODE:str=os.getenv("DATA_INGESTION_SPLIT_MODE", "random")
+DATA_INGESTION_SPLIT_STRATIFY:bool=os.getenv("DATA_INGESTION_SPLIT_STRATIFY", "false").lower() == "true"
+DATA_INGESTION_SPLIT_CHUNK_ROWS:int=int(os.getenv("DATA_INGESTION_SPLIT_CHUNK_ROWS", 100000))
+DATA_INGESTION_SPLIT_KEY_COLUMN:str="uri"
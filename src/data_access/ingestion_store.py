@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import glob
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+import pandas as pd
+from bson import ObjectId
+
+from src.exception import MyException
+from src.logger import logging
+
+WATERMARK_FILE_NAME = "_watermark.json"
+PARTITION_PREFIX = "part-"
+# Column holding each document's `_id` as a hex string; it sorts like the ObjectIds themselves
+ID_COLUMN = "_id"
+
+
+class PartitionedDatasetStore:
+    """
+    A local dataset that persists across training runs: one Parquet partition per
+    ingestion run that found new documents, plus a watermark file recording the
+    largest `_id` ingested so far.
+
+    Layout:
+        <store_dir>/part-00000.parquet   first (full) pull
+        <store_dir>/part-00001.parquet   documents added since, one file per run
+        <store_dir>/_watermark.json      {"last_id": ..., "rows": ..., "partitions": ...}
+
+    A partition is written before the watermark moves past it, so an interrupted run
+    leaves at worst an extra partition that the next run overwrites.
+
+    Partitions keep the `_id` of every row, so documents that an export re-reads behind
+    the watermark are dropped instead of being stored twice.
+    """
+
+    def __init__(self, store_dir: str):
+        """
+        Args:
+            store_dir (str): Directory holding the partitions and the watermark of one collection.
+        """
+        self.store_dir = store_dir
+        self.watermark_file_path = os.path.join(store_dir, WATERMARK_FILE_NAME)
+
+    def read_watermark(self) -> dict:
+        """
+        Returns the watermark state, or an empty state if nothing was ingested yet.
+        """
+        try:
+            if not os.path.exists(self.watermark_file_path):
+                return {"last_id": None, "rows": 0, "partitions": 0}
+            with open(self.watermark_file_path) as watermark_file:
+                state = json.load(watermark_file)
+            if state.get("last_id") is not None:
+                state["last_id"] = ObjectId(state["last_id"])
+            return state
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def _write_watermark(self, state: dict) -> None:
+        temp_path = f"{self.watermark_file_path}.tmp"
+        with open(temp_path, "w") as watermark_file:
+            json.dump({**state, "last_id": None if state["last_id"] is None else str(state["last_id"])},
+                      watermark_file, indent=2)
+        os.replace(temp_path, self.watermark_file_path)
+
+    def stored_ids(self, from_id: str) -> set:
+        """
+        Returns the stored `_id`s that are not smaller than `from_id`.
+        """
+        ids = set()
+        for path in self.partition_paths():
+            # Row-group statistics let Parquet skip the partitions entirely below from_id
+            stored = pd.read_parquet(path, columns=[ID_COLUMN], filters=[(ID_COLUMN, ">=", from_id)])
+            ids.update(stored[ID_COLUMN])
+        return ids
+
+    def append(self, dataframe: pd.DataFrame, last_id: Any) -> Optional[str]:
+        """
+        Writes the rows of `dataframe` whose `_id` is not stored yet as the next partition
+        and advances the watermark to `last_id`.
+
+        Returns:
+            Optional[str]: Path of the new partition, or None if there are no new rows.
+        """
+        try:
+            if not dataframe.empty:
+                seen = dataframe[ID_COLUMN].isin(self.stored_ids(dataframe[ID_COLUMN].min()))
+                if seen.any():
+                    logging.info(f"Dropping {int(seen.sum())} documents that are already stored.")
+                    dataframe = dataframe[~seen]
+            if dataframe.empty:
+                return None
+            os.makedirs(self.store_dir, exist_ok=True)
+            state = self.read_watermark()
+            partition_path = os.path.join(self.store_dir, f"{PARTITION_PREFIX}{state['partitions']:05d}.parquet")
+            dataframe.to_parquet(partition_path, index=False)
+
+            self._write_watermark({
+                "last_id": last_id,
+                "rows": state["rows"] + len(dataframe),
+                "partitions": state["partitions"] + 1,
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+            })
+            logging.info(f"Appended {len(dataframe)} rows to {partition_path}; watermark is now {last_id}.")
+            return partition_path
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def partition_paths(self) -> list:
+        """
+        Returns the committed partitions in ingestion order.
+        """
+        partitions = self.read_watermark()["partitions"]
+        return [os.path.join(self.store_dir, f"{PARTITION_PREFIX}{index:05d}.parquet") for index in range(partitions)]
+
+    def load(self) -> pd.DataFrame:
+        """
+        Reads every committed partition into one DataFrame, without the `_id` column.
+        """
+        try:
+            paths = self.partition_paths()
+            if not paths:
+                return pd.DataFrame()
+            dataframe = pd.concat([pd.read_parquet(path) for path in paths], ignore_index=True)
+            return dataframe.drop(columns=ID_COLUMN, errors="ignore")
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def iter_chunks(self, chunk_rows: int) -> Iterator[pd.DataFrame]:
+        """
+        Yields the committed partitions as DataFrames of at most `chunk_rows` rows, without
+        the `_id` column, so the dataset can be read without holding all of it in memory.
+        """
+        try:
+            import pyarrow.parquet as pq
+            for path in self.partition_paths():
+                parquet_file = pq.ParquetFile(path)
+                columns = [name for name in parquet_file.schema_arrow.names if name != ID_COLUMN]
+                for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+                    yield batch.to_pandas()
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def clear(self) -> None:
+        """
+        Removes all partitions and the watermark, for a full re-pull.
+        """
+        try:
+            # Watermark first: without it the partitions are no longer part of the dataset
+            if os.path.exists(self.watermark_file_path):
+                os.remove(self.watermark_file_path)
+            for path in glob.glob(os.path.join(self.store_dir, f"{PARTITION_PREFIX}*.parquet")):
+                os.remove(path)
+            logging.info(f"Cleared the ingestion store at {self.store_dir}.")
+        except Exception as e:
+            raise MyException(e, sys) from e
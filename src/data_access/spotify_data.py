@@ -2,12 +2,149 @@ import sys
 import pandas as pd
 import numpy as np
 import logging
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice, repeat
+from typing import Any, Iterator, List, Optional, Tuple
+
+from bson import ObjectId
 
 from src.configuration.mongo_db_connection import MongoDBClient
-from src.constants import DATABASE_NAME,COLLECTION_NAME
+from src.data_access.ingestion_store import ID_COLUMN
+from src.constants import DATABASE_NAME,COLLECTION_NAME,MONGO_EXPORT_BATCH_SIZE,MONGO_EXPORT_WORKERS,SCHEMA_FILE_PATH
 from src.exception import MyException
 from src.logger import logging 
+from src.utils.main_utils import read_yaml_file
+
+# Placeholder the source data uses for missing values
+NA_PLACEHOLDER = "na"
+NUMERIC_SCHEMA_TYPES = ("int", "float")
+# _id ranges per worker in parallel exports, so a slow range does not leave the other workers idle
+RANGES_PER_WORKER = 4
+# Sampled _ids per range when choosing split points
+SAMPLES_PER_RANGE = 32
+
+
+class ColumnBuffers:
+    """
+    Accumulates batches of MongoDB documents as one typed NumPy array per schema column,
+    so the documents of a batch can be released as soon as it is converted.
+
+    Numeric columns are float64 while buffering ("na", missing fields and values that
+    do not parse as numbers become NaN, the latter with a logged count);
+    `int` columns without missing values are narrowed back to int64 at the end.
+    """
+
+    def __init__(self, column_types: dict):
+        """
+        Args:
+            column_types (dict): Column name -> schema type ("int", "float", "string").
+        """
+        self.column_types = column_types
+        self.chunks = {name: [] for name in column_types}
+        self.seen_columns = set()
+        self.rows = 0
+
+    @staticmethod
+    def _numeric(values: list, name: str = "") -> np.ndarray:
+        try:
+            # None converts to NaN here; only strings need the slower paths
+            return np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            pass
+        try:
+            return np.array([np.nan if value == NA_PLACEHOLDER else value for value in values], dtype=np.float64)
+        except (TypeError, ValueError):
+            # Other unparseable values (e.g. "", "12a", lists) become NaN instead of failing the export
+            raw = pd.Series(values, dtype=object)
+            column = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=np.float64)
+            coerced = int((np.isnan(column) & ~(raw.isna() | (raw == NA_PLACEHOLDER)).to_numpy()).sum())
+            if coerced:
+                logging.warning(f"Coerced {coerced} unparseable values in column '{name}' to NaN.")
+            return column
+
+    @staticmethod
+    def _strings(values: list) -> np.ndarray:
+        column = np.empty(len(values), dtype=object)
+        column[:] = [np.nan if value is None or value == NA_PLACEHOLDER else value for value in values]
+        return column
+
+    def append(self, documents: List[dict]) -> None:
+        for document in documents:
+            self.seen_columns.update(document)
+        for name, column_type in self.column_types.items():
+            values = [document.get(name) for document in documents]
+            if column_type in NUMERIC_SCHEMA_TYPES:
+                self.chunks[name].append(self._numeric(values, name))
+            else:
+                self.chunks[name].append(self._strings(values))
+        self.rows += len(documents)
+
+    def extend(self, other: "ColumnBuffers") -> None:
+        """
+        Appends the chunks of another ColumnBuffers, e.g. one filled by a worker process.
+        """
+        for name, chunks in other.chunks.items():
+            self.chunks[name].extend(chunks)
+        self.seen_columns.update(other.seen_columns)
+        self.rows += other.rows
+
+    def to_dataframe(self, fixed_columns: bool = False) -> pd.DataFrame:
+        """
+        Concatenates the buffered chunks. Columns absent from every document are left out,
+        as they would be when building the frame from the documents themselves.
+
+        With `fixed_columns` every schema column is kept and int columns stay float64, so
+        frames built from separate batches share one set of columns and dtypes
+        (see arrow_schema).
+        """
+        columns = {}
+        for name, column_type in self.column_types.items():
+            if name not in self.seen_columns and not fixed_columns:
+                continue
+            column = np.concatenate(self.chunks.pop(name))
+            if column_type == "int" and not fixed_columns and not np.isnan(column).any():
+                column = column.astype(np.int64)
+            columns[name] = column
+        return pd.DataFrame(columns, copy=False)
+
+    @staticmethod
+    def arrow_schema(column_types: dict):
+        """
+        Returns the pyarrow schema of to_dataframe(fixed_columns=True) frames: float64
+        for numeric columns and string for the rest.
+        """
+        import pyarrow as pa
+        return pa.schema([(name, pa.float64() if column_type in NUMERIC_SCHEMA_TYPES else pa.string())
+                          for name, column_type in column_types.items()])
+
+
+def iter_batches(cursor, batch_size: int) -> Iterator[List[dict]]:
+    """
+    Yields lists of at most `batch_size` documents from a cursor.
+    """
+    while True:
+        batch = list(islice(cursor, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _reset_mongo_client() -> None:
+    # Worker process initializer: a pymongo client must not be used across fork, so each
+    # worker opens its own connection from the same MONGODB_URL settings
+    MongoDBClient.client = None
+
+
+def _export_range(database_name: str, collection_name: str, query: dict, column_types: dict,
+                  batch_size: int) -> ColumnBuffers:
+    """
+    Reads one `_id` range in a worker process and returns its typed column chunks.
+    """
+    collection = MongoDBClient(database_name=database_name).database[collection_name]
+    buffers, _ = SpotifyData._read_in_batches(collection, query, column_types, batch_size, with_ids=False)
+    return buffers
+
 
 class SpotifyData:
     """
@@ -29,13 +166,109 @@ class SpotifyData:
             logging.error(f"Error during MongoDB client initialization: {e}")
             raise MyException(e, sys)
         
-    def export_collection_as_dataframe(self, collection_name: str = COLLECTION_NAME, database_name: Optional[str] = None) -> pd.DataFrame:
+    def _get_collection(self, collection_name: str, database_name: Optional[str]):
+        # Determine the database to connect to.
+        if database_name is None:
+            logging.info(f"Using default database.")
+            return self.mongo_client.database[collection_name]
+        logging.info(f"Using specified database: {database_name}.")
+        return self.mongo_client.client[database_name][collection_name]
+
+    @staticmethod
+    def _read_in_batches(collection, query: dict, column_types: dict, batch_size: int,
+                         with_ids: bool) -> Tuple[ColumnBuffers, Optional[list]]:
+        """
+        Reads the documents matching `query` into ColumnBuffers, converting one batch while
+        a background thread fetches the next. Returns the buffers and the `_id` of every
+        document read, in the same order (None unless `with_ids`).
+        """
+        # Project onto the schema columns; '_id' is only fetched when it is needed.
+        projection = {"_id": int(with_ids), **{name: 1 for name in column_types}}
+        cursor = collection.find(query, projection, batch_size=batch_size)
+
+        buffers = ColumnBuffers(column_types)
+        ids = [] if with_ids else None
+        batches = iter_batches(cursor, batch_size)
+        try:
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="mongo-export") as prefetcher:
+                next_batch = prefetcher.submit(next, batches, None)
+                while True:
+                    documents = next_batch.result()
+                    if documents is None:
+                        break
+                    next_batch = prefetcher.submit(next, batches, None)
+                    buffers.append(documents)
+                    if with_ids:
+                        ids.extend(document["_id"] for document in documents)
+                    del documents
+        finally:
+            cursor.close()
+        return buffers, ids
+
+    @staticmethod
+    def _id_range_queries(collection, n_ranges: int) -> List[dict]:
+        """
+        Splits the collection into about `n_ranges` contiguous `_id` ranges of similar size,
+        using quantiles of a `$sample` of _ids as split points. Returns one query per range;
+        together they cover every document, including ones inserted meanwhile.
+        """
+        sample = collection.aggregate([{"$sample": {"size": n_ranges * SAMPLES_PER_RANGE}}, {"$project": {"_id": 1}}])
+        ids = sorted({document["_id"] for document in sample})
+        if len(ids) < n_ranges:
+            return [{}]
+
+        step = len(ids) / n_ranges
+        split_points = sorted({ids[int(i * step)] for i in range(1, n_ranges)})
+        bounds = [None, *split_points, None]
+        queries = []
+        for low, high in zip(bounds[:-1], bounds[1:]):
+            condition = {}
+            if low is not None:
+                condition["$gte"] = low
+            if high is not None:
+                condition["$lt"] = high
+            queries.append({"_id": condition})
+        return queries
+
+    def _read_in_parallel(self, collection, collection_name: str, database_name: Optional[str], column_types: dict,
+                          batch_size: int, workers: int) -> ColumnBuffers:
+        """
+        Reads `_id` ranges concurrently in `workers` processes, each with its own cursor,
+        BSON decoding and column conversion, and merges their chunks in `_id` order.
+        """
+        queries = self._id_range_queries(collection, workers * RANGES_PER_WORKER)
+        logging.info(f"Reading {len(queries)} _id ranges with {workers} worker processes.")
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_reset_mongo_client) as pool:
+            parts = pool.map(_export_range, repeat(database_name or self.mongo_client.database_name),
+                             repeat(collection_name), queries, repeat(column_types), repeat(batch_size))
+            buffers = ColumnBuffers(column_types)
+            for part in parts:
+                buffers.extend(part)
+        return buffers
+
+    def export_collection_as_dataframe(self, collection_name: str = COLLECTION_NAME, database_name: Optional[str] = None,
+                                       batch_size: int = MONGO_EXPORT_BATCH_SIZE,
+                                       schema_file_path: str = SCHEMA_FILE_PATH,
+                                       workers: int = MONGO_EXPORT_WORKERS) -> pd.DataFrame:
         """
         Exports a MongoDB collection into a pandas DataFrame.
 
+        Only the columns listed in schema.yaml are fetched. Documents are read in batches
+        of `batch_size` and each batch is converted straight into typed column arrays
+        ("na" becomes NaN), while a background thread already fetches the next batch.
+        Peak memory is about two batches of documents plus twice the final frame, instead
+        of the whole collection as Python dicts.
+
+        With `workers` > 1 the collection is split into `_id` ranges that worker processes
+        read concurrently, for collections where one cursor on one core is the bottleneck.
+
         Args:
             collection_name (str): The name of the collection to export. Defaults to the value in constants.
             database_name (Optional[str]): The name of the database. If None, the default database is used.
+            batch_size (int): Documents fetched and converted per round trip.
+            schema_file_path (str): Schema whose `columns` are projected and typed.
+            workers (int): Worker processes reading `_id` ranges in parallel; 1 reads with a single cursor.
 
         Returns:
             pd.DataFrame: A pandas DataFrame containing the data from the specified MongoDB collection.
@@ -45,37 +278,119 @@ class SpotifyData:
         """
         try:
             logging.info(f"Starting to export collection '{collection_name}' as a DataFrame.")
+            collection = self._get_collection(collection_name, database_name)
+            column_types = read_yaml_file(schema_file_path)["columns"]
 
-            # Determine the database to connect to.
-            if database_name is None:
-                collection = self.mongo_client.database[collection_name]
-                logging.info(f"Using default database.")
-            else:
-                # Correcting the variable name to 'collection' instead of 'collection_name'
-                collection = self.mongo_client.client[database_name][collection_name]
-                logging.info(f"Using specified database: {database_name}.")
-            
             # Fetch data from MongoDB
-            logging.info("Fetching all documents from the collection...")
-            df = pd.DataFrame(list(collection.find()))
-            logging.info(f"Successfully fetched {len(df)} documents.")
-            
+            logging.info(f"Fetching documents from the collection in batches of {batch_size}...")
+            if workers > 1:
+                buffers = self._read_in_parallel(collection, collection_name, database_name, column_types,
+                                                 batch_size, workers)
+            else:
+                buffers, _ = self._read_in_batches(collection, {}, column_types, batch_size, with_ids=False)
+            logging.info(f"Successfully fetched {buffers.rows} documents.")
+
             # Check if the DataFrame is empty.
-            if df.empty:
+            if buffers.rows == 0:
                 logging.warning("The fetched DataFrame is empty.")
-                return df
-                
-            # Drop the '_id' column, which is an internal MongoDB identifier.
-            if "_id" in df.columns:
-                df = df.drop(columns=["_id"], axis=1)
-                logging.info("Dropped the default '_id' column from the DataFrame.")
-                
-            # Replace placeholder string "na" with numpy's NaN for proper numeric handling.
-            df.replace({"na": np.nan}, inplace=True)
-            logging.info("Replaced 'na' values with NaN.")
-            
+                return pd.DataFrame()
+
+            df = buffers.to_dataframe()
+            logging.info("Built typed columns with 'na' values as NaN.")
             return df
 
         except Exception as e:
             logging.error(f"Error exporting collection '{collection_name}' as DataFrame: {e}")
-            raise MyException(e, sys)
\ No newline at end of file
+            raise MyException(e, sys)
+
+    def iter_collection_frames(self, collection_name: str = COLLECTION_NAME, database_name: Optional[str] = None,
+                               batch_size: int = MONGO_EXPORT_BATCH_SIZE,
+                               schema_file_path: str = SCHEMA_FILE_PATH) -> Iterator[pd.DataFrame]:
+        """
+        Yields a MongoDB collection as one DataFrame per batch of `batch_size` documents,
+        for exports written out as they are read instead of collected into one frame.
+
+        Every frame has all schema columns with the dtypes of ColumnBuffers.arrow_schema
+        (int columns stay float64, since a later batch may hold missing values), so the
+        frames can be appended to one file.
+
+        Args:
+            collection_name (str): The name of the collection to export. Defaults to the value in constants.
+            database_name (Optional[str]): The name of the database. If None, the default database is used.
+            batch_size (int): Documents fetched and converted per round trip.
+            schema_file_path (str): Schema whose `columns` are projected and typed.
+        """
+        try:
+            collection = self._get_collection(collection_name, database_name)
+            column_types = read_yaml_file(schema_file_path)["columns"]
+            projection = {"_id": 0, **{name: 1 for name in column_types}}
+            cursor = collection.find({}, projection, batch_size=batch_size)
+            logging.info(f"Streaming collection '{collection_name}' in batches of {batch_size}.")
+        except Exception as e:
+            logging.error(f"Error exporting collection '{collection_name}' in batches: {e}")
+            raise MyException(e, sys)
+
+        try:
+            for documents in iter_batches(cursor, batch_size):
+                buffers = ColumnBuffers(column_types)
+                buffers.append(documents)
+                del documents
+                yield buffers.to_dataframe(fixed_columns=True)
+        except Exception as e:
+            logging.error(f"Error exporting collection '{collection_name}' in batches: {e}")
+            raise MyException(e, sys)
+        finally:
+            cursor.close()
+
+    def export_documents_after(self, after_id=None, overlap_seconds: int = 0,
+                               collection_name: str = COLLECTION_NAME, database_name: Optional[str] = None,
+                               batch_size: int = MONGO_EXPORT_BATCH_SIZE,
+                               schema_file_path: str = SCHEMA_FILE_PATH) -> Tuple[pd.DataFrame, Any]:
+        """
+        Exports the documents inserted since `after_id`, for incremental ingestion.
+
+        ObjectIds start with their creation time in whole seconds, but they are generated
+        by the writers, so a document can be inserted after the watermark was taken with
+        a smaller `_id` (same second, clock skew, a slow writer). To catch those, the
+        export starts `overlap_seconds` of `_id` time before `after_id`; the caller must
+        drop the documents it already has by the `_id` column of the returned frame.
+        Documents arriving more than `overlap_seconds` late are still missed.
+
+        Args:
+            after_id (Optional[ObjectId]): High-watermark of the previous export; None exports everything.
+            overlap_seconds (int): Seconds of `_id` time to re-read behind `after_id`.
+            collection_name (str): The name of the collection to export. Defaults to the value in constants.
+            database_name (Optional[str]): The name of the database. If None, the default database is used.
+            batch_size (int): Documents fetched and converted per round trip.
+            schema_file_path (str): Schema whose `columns` are projected and typed.
+
+        Returns:
+            Tuple[pd.DataFrame, Any]: The documents with their `_id` as a string column, and the
+                                      new high-watermark (never below `after_id`).
+        """
+        try:
+            collection = self._get_collection(collection_name, database_name)
+            column_types = read_yaml_file(schema_file_path)["columns"]
+
+            if after_id is None:
+                query = {}
+            elif overlap_seconds > 0:
+                # The smallest ObjectId that can have been generated `overlap_seconds` before after_id
+                start_id = ObjectId.from_datetime(after_id.generation_time - timedelta(seconds=overlap_seconds))
+                query = {"_id": {"$gte": start_id}}
+            else:
+                query = {"_id": {"$gt": after_id}}
+            logging.info(f"Exporting documents of '{collection_name}' matching {query}.")
+            buffers, ids = self._read_in_batches(collection, query, column_types, batch_size, with_ids=True)
+            logging.info(f"Fetched {buffers.rows} documents.")
+
+            if buffers.rows == 0:
+                return pd.DataFrame(), after_id
+            dataframe = buffers.to_dataframe()
+            dataframe.insert(0, ID_COLUMN, [str(document_id) for document_id in ids])
+            last_id = max(ids) if after_id is None else max(max(ids), after_id)
+            return dataframe, last_id
+
+        except Exception as e:
+            logging.error(f"Error exporting new documents of '{collection_name}': {e}")
+            raise MyException(e, sys)
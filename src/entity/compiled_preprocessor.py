@@ -0,0 +1,144 @@
+import sys
+from typing import TYPE_CHECKING, List
+
+import numpy as np
+
+from src.exception import MyException
+from src.logger import logging
+
+if TYPE_CHECKING:
+    from sklearn.compose import ColumnTransformer
+
+
+class CompiledPreprocessor:
+    """
+    A fixed NumPy kernel equivalent to the fitted ColumnTransformer built in
+    DataTransformation (StandardScaler on numerical features, OneHotEncoder on
+    categorical features, passthrough remainder).
+
+    It works on raw float arrays whose columns follow `input_columns`, so no pandas
+    DataFrame has to be built per request. Only the scaler / encoder / passthrough
+    steps used by this project are supported; anything else raises on compile and
+    the caller keeps using the sklearn object.
+    """
+
+    def __init__(self, input_columns: List[str], n_output_features: int):
+        """
+        Args:
+            input_columns (List[str]): Column order of the raw arrays passed to transform.
+            n_output_features (int): Width of the transformed matrix.
+        """
+        self.input_columns = list(input_columns)
+        self.n_output_features = n_output_features
+        # (input indices, output offset, mean vector or None, scale vector or None)
+        self.numeric_blocks: list = []
+        # (input index, output offset, sorted category table, raise on unknown)
+        self.categorical_blocks: list = []
+        # (input indices, output offset)
+        self.passthrough_blocks: list = []
+
+    @classmethod
+    def from_column_transformer(cls, preprocessor: "ColumnTransformer",
+                                input_columns: List[str]) -> "CompiledPreprocessor":
+        """
+        Extracts mean/scale vectors and category index tables from a fitted ColumnTransformer.
+
+        Args:
+            preprocessor (ColumnTransformer): The fitted preprocessing object.
+            input_columns (List[str]): Column order of the raw arrays that will be transformed.
+
+        Returns:
+            CompiledPreprocessor: The compiled kernel.
+        """
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+        try:
+            column_index = {column: i for i, column in enumerate(input_columns)}
+            output_indices = preprocessor.output_indices_
+            n_output_features = max((s.stop for s in output_indices.values()), default=0)
+            compiled = cls(input_columns, n_output_features)
+
+            for name, transformer, columns in preprocessor.transformers_:
+                if transformer == "drop" or len(columns) == 0:
+                    continue
+                if isinstance(columns[0], str):
+                    indices = np.array([column_index[column] for column in columns])
+                else:
+                    # remainder columns are given as positions in the fitted frame
+                    fitted_columns = list(preprocessor.feature_names_in_)
+                    indices = np.array([column_index[fitted_columns[i]] for i in columns])
+                offset = output_indices[name].start
+
+                steps = transformer.steps if isinstance(transformer, Pipeline) else [(name, transformer)]
+                if len(steps) != 1:
+                    raise ValueError(f"Cannot compile multi-step transformer '{name}'.")
+                step = steps[0][1]
+
+                if step == "passthrough":
+                    compiled.passthrough_blocks.append((indices, offset))
+                elif isinstance(step, StandardScaler):
+                    mean = step.mean_ if step.with_mean else None
+                    scale = step.scale_ if step.with_std else None
+                    compiled.numeric_blocks.append((indices, offset, mean, scale))
+                elif isinstance(step, OneHotEncoder):
+                    if step.drop_idx_ is not None or getattr(step, "_infrequent_enabled", False):
+                        raise ValueError(f"Cannot compile OneHotEncoder '{name}' with drop/infrequent categories.")
+                    for index, categories in zip(indices, step.categories_):
+                        compiled.categorical_blocks.append(
+                            (index, offset, np.asarray(categories, dtype=np.float64), step.handle_unknown == "error")
+                        )
+                        offset += len(categories)
+                else:
+                    raise ValueError(f"Cannot compile transformer step {type(step).__name__}.")
+
+            logging.info(f"Compiled preprocessor to NumPy kernel with {n_output_features} output features.")
+            return compiled
+
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def transform(self, features: np.ndarray) -> np.ndarray:
+        """
+        Transforms a (n_rows, len(input_columns)) float array.
+
+        Returns:
+            np.ndarray: The dense transformed matrix, identical to the sklearn output.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        n_rows = features.shape[0]
+        output = np.zeros((n_rows, self.n_output_features), dtype=np.float64)
+
+        for indices, offset, mean, scale in self.numeric_blocks:
+            block = features[:, indices]
+            if mean is not None:
+                block = block - mean
+            if scale is not None:
+                block = block / scale
+            output[:, offset:offset + len(indices)] = block
+
+        rows = np.arange(n_rows)
+        for index, offset, categories, raise_unknown in self.categorical_blocks:
+            values = features[:, index]
+            positions = np.searchsorted(categories, values)
+            clipped = np.minimum(positions, len(categories) - 1)
+            known = categories[clipped] == values
+            if raise_unknown and not known.all():
+                raise ValueError(f"Found unknown categories in column '{self.input_columns[index]}'.")
+            output[rows[known], offset + clipped[known]] = 1.0
+
+        for indices, offset in self.passthrough_blocks:
+            output[:, offset:offset + len(indices)] = features[:, indices]
+
+        return output
+
+    def matches(self, preprocessor: "ColumnTransformer", dataframe) -> bool:
+        """
+        Parity check: transforms `dataframe` with both the sklearn object and this kernel
+        and reports whether the matrices agree.
+        """
+        expected = preprocessor.transform(dataframe)
+        if hasattr(expected, "toarray"):
+            expected = expected.toarray()
+        actual = self.transform(dataframe[self.input_columns].to_numpy(dtype=np.float64))
+        return expected.shape == actual.shape and np.allclose(expected, actual, rtol=0.0, atol=1e-12, equal_nan=True)
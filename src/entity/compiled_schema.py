@@ -0,0 +1,168 @@
+import sys
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from src.constants import SCHEMA_FILE_PATH
+from src.exception import MyException
+from src.utils.main_utils import read_yaml_file
+
+INTEGER_DTYPES = (np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32, np.int64)
+# String columns with at most this share of distinct values are stored as categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def smallest_integer_dtype(low: float, high: float) -> np.dtype:
+    """
+    Returns the narrowest integer dtype that holds every value in [low, high].
+    """
+    for dtype in INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class CompiledSchema:
+    """
+    Compact in-memory dtypes compiled from config/schema.yaml:
+
+    - float columns with a `numerical_ranges` rule are float32, other floats stay float64
+    - int columns get the narrowest integer type covering both their schema rule
+      (`categorical_values` or `numerical_ranges`) and the values actually present,
+      so out-of-rule data never wraps around; with missing values they become float32
+    - string columns become categoricals when values repeat enough, otherwise stay strings
+
+    The compact dtypes are for storage and validation. Frames that feed the preprocessor
+    or a model go through model_inputs() first, so training sees the same float64/int64
+    dtypes as the serving path.
+    """
+
+    def __init__(self, column_types: Dict[str, str], float_dtypes: Dict[str, np.dtype],
+                 integer_bounds: Dict[str, tuple]):
+        """
+        Args:
+            column_types (Dict[str, str]): Column name -> schema type ("int", "float", "string").
+            float_dtypes (Dict[str, np.dtype]): Float column -> dtype to store it as.
+            integer_bounds (Dict[str, tuple]): Int column -> (low, high) allowed by its rule.
+        """
+        self.column_types = column_types
+        self.float_dtypes = float_dtypes
+        self.integer_bounds = integer_bounds
+
+    @classmethod
+    def from_schema(cls, schema_file_path: str = SCHEMA_FILE_PATH) -> "CompiledSchema":
+        try:
+            schema = read_yaml_file(schema_file_path)
+            rules = schema.get("rules", {})
+            ranges = rules.get("numerical_ranges", {})
+            categories = rules.get("categorical_values", {})
+
+            float_dtypes, integer_bounds = {}, {}
+            for name, column_type in schema["columns"].items():
+                if column_type == "float":
+                    float_dtypes[name] = np.dtype(np.float32 if name in ranges else np.float64)
+                elif column_type == "int" and name in categories:
+                    integer_bounds[name] = (min(categories[name]), max(categories[name]))
+                elif column_type == "int" and name in ranges:
+                    integer_bounds[name] = tuple(ranges[name])
+            return cls(schema["columns"], float_dtypes, integer_bounds)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def _compact_integer(self, name: str, column: pd.Series) -> pd.Series:
+        if column.isna().any() or (column.dtype.kind == "f" and (column % 1 != 0).any()):
+            return column.astype(np.float32)
+        low, high = self.integer_bounds.get(name, (0, 0))
+        if len(column):
+            low, high = min(low, column.min()), max(high, column.max())
+        return column.astype(smallest_integer_dtype(low, high))
+
+    def apply(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns `dataframe` with its schema columns cast to the compact dtypes. Columns
+        not in the schema are kept as they are.
+        """
+        try:
+            columns = {}
+            for name in dataframe.columns:
+                column = dataframe[name]
+                column_type = self.column_types.get(name)
+                if column_type == "float":
+                    column = column.astype(self.float_dtypes[name])
+                elif column_type == "int":
+                    column = self._compact_integer(name, column)
+                elif column_type == "string" and not isinstance(column.dtype, pd.CategoricalDtype):
+                    if column.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(column):
+                        column = column.astype("category")
+                columns[name] = column
+            return pd.DataFrame(columns, copy=False)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def model_inputs(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns `dataframe` with its numeric schema columns widened to the dtypes serving
+        sends to the preprocessor (SpotifyBatch): float64, and int64 for int columns
+        without missing values (including ones stored as whole floats, as streamed
+        ingestion writes them). The preprocessor and model are then fitted and evaluated
+        on the same dtypes they score in production.
+
+        Widening is exact, but values stored as float32 keep their float32 rounding
+        (about 7 significant digits, below the precision of the source features).
+        """
+        try:
+            columns = {}
+            for name in dataframe.columns:
+                column = dataframe[name]
+                column_type = self.column_types.get(name)
+                if column_type == "int" and (column.dtype.kind in "iu" or _holds_integers(column)):
+                    column = column.astype(np.int64)
+                elif column_type in ("int", "float"):
+                    column = column.astype(np.float64)
+                columns[name] = column
+            return pd.DataFrame(columns, copy=False)
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+
+def _holds_integers(column: pd.Series) -> bool:
+    return column.dtype.kind == "f" and column.notna().all() and bool((column % 1 == 0).all())
+
+
+@lru_cache(maxsize=None)
+def load_compiled_schema(schema_file_path: str = SCHEMA_FILE_PATH) -> CompiledSchema:
+    """
+    Compiles schema.yaml once per process.
+    """
+    return CompiledSchema.from_schema(schema_file_path)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> dict:
+    """
+    Compares the in-memory size of a frame before and after compaction.
+
+    Returns:
+        dict: Rows, total and per-row bytes before and after, and per-column dtypes and bytes.
+    """
+    rows = max(len(before), 1)
+    bytes_before = before.memory_usage(index=False, deep=True)
+    bytes_after = after.memory_usage(index=False, deep=True)
+    return {
+        "rows": len(before),
+        "bytes_before": int(bytes_before.sum()),
+        "bytes_after": int(bytes_after.sum()),
+        "bytes_per_row_before": round(bytes_before.sum() / rows, 1),
+        "bytes_per_row_after": round(bytes_after.sum() / rows, 1),
+        "columns": {
+            name: {
+                "dtype_before": str(before[name].dtype),
+                "dtype_after": str(after[name].dtype),
+                "bytes_per_row_before": round(bytes_before[name] / rows, 2),
+                "bytes_per_row_after": round(bytes_after.get(name, 0) / rows, 2),
+            }
+            for name in before.columns if name in after.columns
+        },
+    }
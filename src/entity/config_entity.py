@@ -2,6 +2,7 @@ from src.constants import *
 import os
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 
 TIMESTAMP:str=datetime.now().strftime("%m_%d_%Y_%H_%M_%S")
 
@@ -18,7 +19,19 @@ class DataIngestionConfig:
     data_ingestion_raw_data_file:str=os.path.join(data_ingestion_dir,"raw_data",DATA_INGESTION_RAW_DATA_FILE)
     data_ingestion_train_file_path:str=os.path.join(data_ingestion_ingested_dir,TRAIN_FILE_NAME)
     data_ingestion_test_file_path:str=os.path.join(data_ingestion_ingested_dir,TEST_FILE_NAME)
+    memory_report_file_path:str=os.path.join(data_ingestion_dir,DATA_INGESTION_MEMORY_REPORT_FILE_NAME)
     train_test_split_ratio:float=TRAIN_TEST_SPLIT_RATIO
+    csv_export:bool=DATA_ARTIFACT_CSV_EXPORT
+    split_mode:str=DATA_INGESTION_SPLIT_MODE
+    split_stratify:bool=DATA_INGESTION_SPLIT_STRATIFY
+    split_chunk_rows:int=DATA_INGESTION_SPLIT_CHUNK_ROWS
+    split_key_column:str=DATA_INGESTION_SPLIT_KEY_COLUMN
+    mongo_export_batch_size:int=MONGO_EXPORT_BATCH_SIZE
+    mongo_export_workers:int=MONGO_EXPORT_WORKERS
+    incremental:bool=DATA_INGESTION_INCREMENTAL
+    full_refresh:bool=DATA_INGESTION_FULL_REFRESH
+    overlap_seconds:int=DATA_INGESTION_OVERLAP_SECONDS
+    store_dir:str=os.path.join(DATA_INGESTION_STORE_DIR,COLLECTION_NAME)
     
 @dataclass
 class DataValidationConfig:
@@ -60,4 +73,52 @@ class ModelPusherConfig:
 class SpotifyHitPredictorConfig:
     model_file_name:str=MODEL_NAME
     model_bucket_name:str=MODEL_BUCKET_NAME
-    
+    warmup_rows:int=PREDICTION_WARMUP_ROWS
+    warmup_rounds:int=PREDICTION_WARMUP_ROUNDS
+    warmup_retry_seconds:float=PREDICTION_WARMUP_RETRY_SECONDS
+    use_compiled_preprocessor:bool=PREDICTION_COMPILED_PREPROCESSOR
+    use_flat_tree_evaluator:bool=PREDICTION_FLAT_TREE_EVALUATOR
+
+
+@dataclass
+class PredictionCoalescerConfig:
+    max_batch_size:int=PREDICTION_COALESCER_MAX_BATCH_SIZE
+    max_wait_ms:float=PREDICTION_COALESCER_MAX_WAIT_MS
+    max_queue_size:int=PREDICTION_COALESCER_MAX_QUEUE_SIZE
+
+
+@dataclass
+class InferenceExecutorConfig:
+    kind:str=INFERENCE_EXECUTOR_KIND
+    max_workers:int=INFERENCE_EXECUTOR_MAX_WORKERS
+    max_pending:int=INFERENCE_EXECUTOR_MAX_PENDING
+    retry_after_seconds:int=INFERENCE_RETRY_AFTER_SECONDS
+
+
+@dataclass
+class PredictionCacheConfig:
+    enabled:bool=PREDICTION_CACHE_ENABLED
+    max_entries:int=PREDICTION_CACHE_MAX_ENTRIES
+    ttl_seconds:float=PREDICTION_CACHE_TTL_SECONDS
+    float_decimals:Optional[int]=PREDICTION_CACHE_FLOAT_DECIMALS
+
+
+@dataclass
+class ModelReloaderConfig:
+    enabled:bool=MODEL_RELOAD_ENABLED
+    poll_interval_seconds:float=MODEL_RELOAD_POLL_SECONDS
+
+
+@dataclass
+class ModelCacheConfig:
+    enabled:bool=MODEL_CACHE_ENABLED
+    cache_dir:str=MODEL_CACHE_DIR
+    keep_versions:int=MODEL_CACHE_KEEP_VERSIONS
+
+
+@dataclass
+class ShadowScoringConfig:
+    challenger_model_file_name:str=SHADOW_CHALLENGER_MODEL_KEY
+    model_bucket_name:str=MODEL_BUCKET_NAME
+    sample_rate:float=SHADOW_SAMPLE_RATE
+    max_pending:int=SHADOW_MAX_PENDING
@@ -1,10 +1,18 @@
 import sys
+from typing import TYPE_CHECKING
+import numpy as np
 import pandas as pd
 from pandas import DataFrame
-from sklearn.pipeline import Pipeline
 
+from src.entity.compiled_preprocessor import CompiledPreprocessor
+from src.entity.tree_ensemble import FlatTreeEnsemble
 from src.exception import MyException
-from src.logger import logging
+from src.logger import logging, hot_path_logger
+from src.utils.metrics import STAGE_LATENCY
+
+if TYPE_CHECKING:
+    # sklearn is only needed to unpickle a model, which imports it on demand
+    from sklearn.pipeline import Pipeline
 
 class TargetValueMapping:
     """
@@ -30,7 +38,12 @@ class MyModel:
     Ensures preprocessing and prediction are applied consistently.
     """
 
-    def __init__(self, preprocessing_object: Pipeline, trained_model_object: object):
+    # Optional NumPy fast paths, set by compile_preprocessor() / flatten_trained_model().
+    # Declared on the class so models pickled before they existed still load.
+    compiled_preprocessor = None
+    flat_tree_ensemble = None
+
+    def __init__(self, preprocessing_object: "Pipeline", trained_model_object: object):
         """
         :param preprocessing_object: Preprocessing pipeline (scaler, encoder, etc.)
         :param trained_model_object: Trained ML model (sklearn, xgboost, etc.)
@@ -38,19 +51,88 @@ class MyModel:
         self.preprocessing_object = preprocessing_object
         self.trained_model_object = trained_model_object
 
+    @property
+    def input_columns(self) -> list:
+        """
+        Feature column order the preprocessor was fitted on. Raw arrays passed to
+        predict / predict_proba must follow this order.
+        """
+        return list(self.preprocessing_object.feature_names_in_)
+
+    def compile_preprocessor(self, probe_dataframe: pd.DataFrame) -> bool:
+        """
+        Compiles the fitted preprocessor into a NumPy kernel and enables it only if it
+        reproduces the sklearn output on `probe_dataframe`.
+
+        Returns:
+            bool: True if the compiled fast path is now active.
+        """
+        try:
+            compiled = CompiledPreprocessor.from_column_transformer(self.preprocessing_object, self.input_columns)
+            if not compiled.matches(self.preprocessing_object, probe_dataframe):
+                logging.warning("Compiled preprocessor does not match sklearn output. Keeping sklearn path.")
+                return False
+            self.compiled_preprocessor = compiled
+            logging.info("Compiled preprocessor enabled.")
+            return True
+
+        except Exception as e:
+            logging.warning(f"Could not compile preprocessor, keeping sklearn path: {e}")
+            return False
+
+    def flatten_trained_model(self, probe_dataframe: pd.DataFrame) -> bool:
+        """
+        Exports the trained tree ensemble to flat node arrays and enables the vectorized
+        evaluator only if it reproduces the library predict_proba on `probe_dataframe`.
+
+        Returns:
+            bool: True if the flat evaluator is now active.
+        """
+        try:
+            flat_ensemble = FlatTreeEnsemble.from_model(self.trained_model_object)
+            transformed_feature = self.transform(probe_dataframe)
+            if not flat_ensemble.matches(self.trained_model_object, transformed_feature):
+                logging.warning("Flat tree evaluator does not match the trained model. Keeping library predict.")
+                return False
+            self.flat_tree_ensemble = flat_ensemble
+            logging.info("Flat tree evaluator enabled.")
+            return True
+
+        except Exception as e:
+            logging.warning(f"Could not flatten trained model, keeping library predict: {e}")
+            return False
+
+    def transform(self, features) -> np.ndarray:
+        """
+        Applies preprocessing to a DataFrame or to a raw float array in `input_columns` order,
+        using the compiled kernel when it is enabled.
+        """
+        with STAGE_LATENCY.time("transform"):
+            if self.compiled_preprocessor is not None:
+                if isinstance(features, pd.DataFrame):
+                    features = features[self.compiled_preprocessor.input_columns].to_numpy(dtype=np.float64)
+                return self.compiled_preprocessor.transform(features)
+            if isinstance(features, np.ndarray):
+                features = pd.DataFrame(features, columns=self.input_columns)
+            return self.preprocessing_object.transform(features)
+
     def predict(self, dataframe: pd.DataFrame) -> DataFrame:
         """
         Applies preprocessing + prediction.
         """
         try:
-            logging.info("Starting prediction process.")
+            hot_path_logger.info("Starting prediction process.")
 
             # Step 1: Apply preprocessing (scaling, encoding, etc.)
-            transformed_feature = self.preprocessing_object.transform(dataframe)
+            transformed_feature = self.transform(dataframe)
 
             # Step 2: Predict using trained model
-            logging.info("Using trained model to get predictions.")
-            predictions = self.trained_model_object.predict(transformed_feature)
+            hot_path_logger.info("Using trained model to get predictions.")
+            with STAGE_LATENCY.time("model_predict"):
+                if self.flat_tree_ensemble is not None:
+                    predictions = self.flat_tree_ensemble.predict(transformed_feature)
+                else:
+                    predictions = self.trained_model_object.predict(transformed_feature)
 
             return predictions
 
@@ -58,6 +140,37 @@ class MyModel:
             logging.error("Error occurred in predict method", exc_info=True)
             raise MyException(e, sys) from e
 
+    def predict_proba(self, dataframe: pd.DataFrame) -> np.ndarray:
+        """
+        Applies preprocessing + class probability estimation.
+        """
+        try:
+            transformed_feature = self.transform(dataframe)
+            with STAGE_LATENCY.time("model_predict"):
+                if self.flat_tree_ensemble is not None:
+                    return self.flat_tree_ensemble.predict_proba(transformed_feature)
+                return self.trained_model_object.predict_proba(transformed_feature)
+
+        except Exception as e:
+            logging.error("Error occurred in predict_proba method", exc_info=True)
+            raise MyException(e, sys) from e
+
+    def predict_with_proba(self, dataframe: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns labels and class probabilities for a whole batch from a single
+        preprocessing pass, instead of transforming once for predict and again
+        for predict_proba.
+        """
+        try:
+            probabilities = self.predict_proba(dataframe)
+            classes = getattr(self.trained_model_object, "classes_", np.arange(probabilities.shape[1]))
+            labels = np.asarray(classes).take(np.argmax(probabilities, axis=1))
+            return labels, probabilities
+
+        except Exception as e:
+            logging.error("Error occurred in predict_with_proba method", exc_info=True)
+            raise MyException(e, sys) from e
+
     def __repr__(self):
         return f"{type(self.trained_model_object).__name__}()"
 
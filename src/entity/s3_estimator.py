@@ -1,6 +1,13 @@
 import sys
+import pickle
+import threading
+from typing import Optional
 from pandas import DataFrame
 from src.cloud_storage.aws_storage import SimpleStorageService
+from src.cloud_storage.model_cache import LocalModelCache
+from src.entity.config_entity import ModelCacheConfig
+from src.logger import logging
+from src.utils.metrics import STAGE_LATENCY
 from src.exception import MyException
 from src.entity.estimator import MyModel   
 
@@ -9,15 +16,20 @@ class Proj1Estimator:
     Handles saving, loading, and predicting with model stored in S3.
     """
 
-    def __init__(self, bucket_name: str, model_path: str):
+    def __init__(self, bucket_name: str, model_path: str, model_cache_config: ModelCacheConfig = ModelCacheConfig()):
         """
         :param bucket_name: S3 bucket name
         :param model_path: Path to model inside bucket
+        :param model_cache_config: Local on-disk model cache settings
         """
         self.bucket_name = bucket_name
         self.s3 = SimpleStorageService()
         self.model_path = model_path
         self.loaded_model: MyModel = None
+        # S3 ETag of the model currently in memory
+        self.model_version: Optional[str] = None
+        self._swap_lock = threading.Lock()
+        self.model_cache = LocalModelCache(bucket_name, model_path, model_cache_config) if model_cache_config.enabled else None
 
     def is_model_present(self, model_path: str) -> bool:
         """
@@ -33,9 +45,71 @@ class Proj1Estimator:
 
     def load_model(self) -> MyModel:
         """
-        Load MyModel object from S3.
+        Load MyModel object from S3 (or the local model cache) and record its version.
         """
-        return self.s3.load_model(self.model_path, bucket_name=self.bucket_name)
+        model, self.model_version = self.fetch_model()
+        return model
+
+    def get_remote_version(self) -> str:
+        """
+        Return the current ETag of the model object in S3 (HEAD request only).
+        """
+        return self.s3.get_object_version(self.model_path, bucket_name=self.bucket_name)
+
+    def fetch_model(self) -> tuple[MyModel, str]:
+        """
+        Download the current model from S3 without touching the model being served.
+
+        Returns:
+            tuple[MyModel, str]: The model and the ETag it was loaded at.
+        """
+        try:
+            with STAGE_LATENCY.time("model_load"):
+                return self._fetch_model()
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def _fetch_model(self) -> tuple[MyModel, str]:
+        if self.model_cache is None:
+            content, version = self.s3.get_object_bytes(self.model_path, bucket_name=self.bucket_name)
+            return pickle.loads(content), version
+
+        # Conditional GET against the newest cached version: unchanged models cost one
+        # 304 response instead of a full download
+        cached_version = self.model_cache.latest_version()
+        content, version = self.s3.get_object_bytes(self.model_path, bucket_name=self.bucket_name,
+                                                    if_none_match=cached_version)
+        if content is None:
+            content = self.model_cache.read(version)
+            if content is not None:
+                logging.info(f"Model version {version} unchanged in S3. Loaded from local cache.")
+                return pickle.loads(content), version
+            content, version = self.s3.get_object_bytes(self.model_path, bucket_name=self.bucket_name)
+
+        try:
+            self.model_cache.write(version, content)
+        except OSError as e:
+            logging.warning(f"Could not write model version {version} to local cache: {e}")
+        return pickle.loads(content), version
+
+    def swap_model(self, model: MyModel, version: str) -> None:
+        """
+        Atomically replace the served model. Requests already holding a reference
+        to the previous model finish on it; new requests pick up the new one.
+        """
+        with self._swap_lock:
+            self.model_version = version
+            self.loaded_model = model
+
+    def get_loaded_model(self) -> MyModel:
+        """
+        Return the in-memory model, loading it from S3 on first use.
+        """
+        if self.loaded_model is None:
+            with self._swap_lock:
+                if self.loaded_model is None:
+                    self.loaded_model = self.load_model()
+        return self.loaded_model
 
     def save_model(self, from_file: str, remove: bool = False) -> None:
         """
@@ -59,8 +133,15 @@ class Proj1Estimator:
         Make predictions using loaded model.
         """
         try:
-            if self.loaded_model is None:
-                self.loaded_model = self.load_model()
-            return self.loaded_model.predict(dataframe=dataframe)
+            return self.get_loaded_model().predict(dataframe=dataframe)
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def predict_with_proba(self, dataframe: DataFrame):
+        """
+        Make predictions and class probabilities using loaded model.
+        """
+        try:
+            return self.get_loaded_model().predict_with_proba(dataframe=dataframe)
         except Exception as e:
             raise MyException(e, sys)
@@ -0,0 +1,234 @@
+import sys
+import json
+
+import numpy as np
+
+from src.exception import MyException
+from src.logger import logging
+
+# Largest probability difference from XGBClassifier.predict_proba that matches() accepts.
+# Margins agree exactly, but the sigmoid differs by up to one float32 ulp (~6e-8 measured).
+XGBOOST_PROBA_ATOL = 1e-6
+
+
+class FlatTreeEnsemble:
+    """
+    A trained RandomForestClassifier or binary XGBClassifier exported to contiguous
+    node arrays (feature, threshold, left, right, leaf value), with a NumPy evaluator
+    that walks every tree for every row of a batch at once.
+
+    All trees share one set of arrays; `roots` holds the index of each tree's root.
+    Leaves point to themselves, so a fixed number of `max_depth` steps reaches every
+    leaf without per-node branching in Python.
+    """
+
+    def __init__(self, kind: str, feature: np.ndarray, threshold: np.ndarray,
+                 left: np.ndarray, right: np.ndarray, default_left: np.ndarray,
+                 leaf_value: np.ndarray, roots: np.ndarray, max_depth: int,
+                 classes: np.ndarray, base_margin: float = 0.0):
+        """
+        Args:
+            kind (str): "random_forest" or "xgboost".
+            feature, threshold, left, right (np.ndarray): Split feature, split value and child index per node.
+            default_left (np.ndarray): Whether missing values go left at each node.
+            leaf_value (np.ndarray): Per-node leaf output; class probabilities for random forest,
+                                     margin contribution for XGBoost.
+            roots (np.ndarray): Root node index of each tree.
+            max_depth (int): Depth of the deepest tree.
+            classes (np.ndarray): Class labels, as in the model's classes_.
+            base_margin (float): XGBoost starting margin.
+        """
+        self.kind = kind
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.base_margin = base_margin
+
+    @classmethod
+    def from_model(cls, model: object) -> "FlatTreeEnsemble":
+        """
+        Exports a fitted RandomForestClassifier or XGBClassifier.
+        """
+        try:
+            name = type(model).__name__
+            if name == "RandomForestClassifier":
+                ensemble = cls._from_random_forest(model)
+            elif name == "XGBClassifier":
+                ensemble = cls._from_xgboost(model)
+            else:
+                raise ValueError(f"Cannot flatten model of type {name}.")
+            logging.info(f"Exported {ensemble} with max depth {ensemble.max_depth}.")
+            return ensemble
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @classmethod
+    def _from_random_forest(cls, model) -> "FlatTreeEnsemble":
+        features, thresholds, lefts, rights, defaults, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(tree.node_count)
+
+            # Normalise leaf values to class probabilities exactly like DecisionTreeClassifier.predict_proba
+            value = tree.value[:, 0, :model.n_classes_]
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            # scikit-learn >= 1.3 learns a side for missing values per split; older trees send them right
+            defaults.append(np.asarray(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count)), dtype=bool))
+            values.append(value / normalizer)
+            offset += tree.node_count
+
+        return cls(
+            kind="random_forest",
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            default_left=np.concatenate(defaults),
+            leaf_value=np.concatenate(values),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max(estimator.tree_.max_depth for estimator in model.estimators_),
+            classes=np.asarray(model.classes_),
+        )
+
+    @classmethod
+    def _from_xgboost(cls, model) -> "FlatTreeEnsemble":
+        learner = json.loads(model.get_booster().save_raw("json"))["learner"]
+        if learner["objective"]["name"] != "binary:logistic":
+            raise ValueError(f"Cannot flatten XGBoost objective {learner['objective']['name']}.")
+        trees = learner["gradient_booster"]["model"]["trees"]
+        if any(tree.get("categories_nodes") for tree in trees):
+            raise ValueError("Cannot flatten XGBoost trees with categorical splits.")
+
+        features, thresholds, lefts, rights, defaults, values, roots, depths = [], [], [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            left = np.array(tree["left_children"])
+            right = np.array(tree["right_children"])
+            condition = np.array(tree["split_conditions"], dtype=np.float32)
+            is_leaf = left == -1
+            node_ids = np.arange(len(left))
+
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree["split_indices"]))
+            thresholds.append(np.where(is_leaf, np.float32(np.inf), condition))
+            lefts.append(np.where(is_leaf, node_ids, left) + offset)
+            rights.append(np.where(is_leaf, node_ids, right) + offset)
+            defaults.append(np.array(tree["default_left"], dtype=bool))
+            # For leaves XGBoost stores the leaf weight in split_conditions
+            values.append(np.where(is_leaf, condition, np.float32(0.0)))
+            depths.append(cls._tree_depth(left, right))
+            offset += len(left)
+
+        base_score = np.float32(learner["learner_model_param"]["base_score"].strip("[]"))
+        base_margin = -np.log(np.float32(1.0) / base_score - np.float32(1.0))
+
+        return cls(
+            kind="xgboost",
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float32),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            default_left=np.concatenate(defaults),
+            leaf_value=np.concatenate(values).astype(np.float32),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max(depths),
+            classes=np.asarray(getattr(model, "classes_", np.array([0, 1]))),
+            base_margin=np.float32(base_margin),
+        )
+
+    @staticmethod
+    def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+        depth, frontier = 0, np.array([0])
+        while True:
+            frontier = np.concatenate([left[frontier], right[frontier]])
+            frontier = frontier[frontier != -1]
+            if frontier.size == 0:
+                return depth
+            depth += 1
+
+    def apply(self, features: np.ndarray) -> np.ndarray:
+        """
+        Returns the leaf node reached in every tree for every row, shape (n_trees, n_rows).
+        """
+        n_rows = features.shape[0]
+        rows = np.arange(n_rows)
+        nodes = np.repeat(self.roots[:, np.newaxis], n_rows, axis=1)
+
+        for _ in range(self.max_depth):
+            values = features[rows, self.feature[nodes]]
+            # XGBoost splits on value < threshold, scikit-learn on value <= threshold
+            if self.kind == "xgboost":
+                go_left = values < self.threshold[nodes]
+            else:
+                go_left = values <= self.threshold[nodes]
+            go_left = np.where(np.isnan(values), self.default_left[nodes], go_left)
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Class probabilities for a batch, matching the original model's predict_proba.
+        """
+        # Both libraries evaluate splits on float32 inputs
+        features = np.asarray(features, dtype=np.float32)
+        leaves = self.apply(features)
+        leaf_values = self.leaf_value[leaves]
+
+        if self.kind == "xgboost":
+            margin = np.full(features.shape[0], self.base_margin, dtype=np.float32)
+            for tree_values in leaf_values:
+                margin += tree_values
+            # XGBoost's float32 sigmoid: 1 / (expf(min(-x, 88.7)) + 1). exp is taken in float64 and
+            # rounded, which tracks libm expf far more closely than NumPy's float32 exp.
+            exponent = np.exp(np.minimum(-margin, np.float32(88.7)).astype(np.float64)).astype(np.float32)
+            positive = np.float32(1.0) / (exponent + np.float32(1.0))
+            return np.vstack((np.float32(1.0) - positive, positive)).T
+
+        # Accumulate tree by tree in the same order as RandomForestClassifier
+        proba = np.zeros(leaf_values.shape[1:], dtype=np.float64)
+        for tree_values in leaf_values:
+            proba += tree_values
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predicted class labels for a batch.
+        """
+        return self.classes_.take(np.argmax(self.predict_proba(features), axis=1))
+
+    def matches(self, model: object, features: np.ndarray) -> bool:
+        """
+        Parity check against the original model on an already-transformed batch.
+        Random forest output must be bit-for-bit identical. The XGBoost path is not:
+        margins match exactly, but XGBoost's sigmoid uses the platform expf, so
+        probabilities may differ by about one float32 ulp. Labels must agree exactly and
+        probabilities to within XGBOOST_PROBA_ATOL (1e-6).
+        """
+        expected = model.predict_proba(features)
+        actual = self.predict_proba(features)
+        if self.kind == "random_forest":
+            return np.array_equal(expected, actual)
+        return bool(np.array_equal(model.predict(features), self.predict(features))
+                    and np.allclose(expected, actual, rtol=0.0, atol=XGBOOST_PROBA_ATOL))
+
+    def __repr__(self):
+        return f"FlatTreeEnsemble(kind={self.kind}, trees={len(self.roots)}, nodes={len(self.feature)})"
+
+    def __str__(self):
+        return self.__repr__()
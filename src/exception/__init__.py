@@ -45,4 +45,18 @@ class MyException(Exception):
         """
         Returns the string representation of the error message.
         """
-        return self.error_message
\ No newline at end of file
+        return self.error_message
+
+
+class ServiceOverloadedException(Exception):
+    """
+    Raised when the serving tier sheds load because its inference queue is full, or
+    cannot score yet because the model is still loading.
+    """
+    def __init__(self, message: str, retry_after_seconds: int = 1):
+        """
+        :param message: A string describing why the request was rejected.
+        :param retry_after_seconds: Suggested client back-off, sent as the Retry-After header.
+        """
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
@@ -1,6 +1,10 @@
-import logging 
-import os 
-from logging.handlers import RotatingFileHandler
+import logging
+import os
+import json
+import atexit
+import queue
+import random
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from from_root import from_root
 from datetime import datetime
 
@@ -11,34 +15,133 @@ LOG_FILE=f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
 MAX_LOG_SIZE=5*1024*1024
 BACKUP_COUNT=3
 
+# "true" hands records to a background thread so callers never wait on file/console I/O
+LOG_ASYNC=os.getenv("LOG_ASYNC", "false").lower() == "true"
+# "text" or "json" (one JSON object per line)
+LOG_FORMAT=os.getenv("LOG_FORMAT", "text")
+# Per-logger sampling of records below WARNING, e.g. "spotify.hot_path=0.01,root=0.5"
+LOG_SAMPLING=os.getenv("LOG_SAMPLING", "")
+# "false" silences the per-request logs of the inference hot path entirely
+LOG_HOT_PATH=os.getenv("LOG_HOT_PATH", "true").lower() == "true"
+
+HOT_PATH_LOGGER_NAME="spotify.hot_path"
+
 log_dir_path=os.path.join(from_root(),LOG_DIR)
-os.makedirs(log_dir_path,exist_ok=True)
 log_file_path=os.path.join(log_dir_path,LOG_FILE)
 
+# Per-request logs (predict, DataFrame conversion, batch scoring). Use %-style arguments
+# so disabled records are never formatted.
+hot_path_logger = logging.getLogger(HOT_PATH_LOGGER_NAME)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each record as a single-line JSON object.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a `rate` fraction of a logger's records below WARNING. Warnings and errors always pass.
+    """
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+def parse_sampling_rates(spec: str) -> dict:
+    """
+    Parses "logger=rate,logger=rate" into {logger: rate}.
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, rate = item.split("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that creates the log directory and file on the first record
+    instead of at import, so importing the package touches no files.
+    """
+    def __init__(self, filename: str, **kwargs):
+        super().__init__(filename, delay=True, **kwargs)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
+_listener = None
+
+
+def _start_listener(queue_handler: QueueHandler, handlers: list) -> None:
+    global _listener
+    queue_handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
 def configure_logger():
     """
     Configures logging with a rotating file handler and a console handler.
+
+    With LOG_ASYNC the root logger only gets a QueueHandler, and a QueueListener thread
+    does the formatting and writing. Forked children (pre-fork workers, process pool
+    workers) start their own listener, since threads do not survive fork.
     """
     # Create a custom logger
     logger = logging.getLogger()
     logger.setLevel(logging.DEBUG)
-    
+
     # Define formatter
-    formatter = logging.Formatter("[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s")
+    if LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("[ %(asctime)s ] %(name)s - %(levelname)s - %(message)s")
 
     # File handler with rotation
-    file_handler = RotatingFileHandler(log_file_path, maxBytes=MAX_LOG_SIZE, backupCount=BACKUP_COUNT)
+    file_handler = LazyRotatingFileHandler(log_file_path, maxBytes=MAX_LOG_SIZE, backupCount=BACKUP_COUNT)
     file_handler.setFormatter(formatter)
     file_handler.setLevel(logging.DEBUG)
-    
+
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
     console_handler.setLevel(logging.INFO)
-    
+
     # Add handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+    if LOG_ASYNC:
+        queue_handler = QueueHandler(queue.SimpleQueue())
+        handlers = [file_handler, console_handler]
+        _start_listener(queue_handler, handlers)
+        atexit.register(lambda: _listener.stop())
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=lambda: _start_listener(queue_handler, handlers))
+        logger.addHandler(queue_handler)
+    else:
+        logger.addHandler(file_handler)
+        logger.addHandler(console_handler)
+
+    for name, rate in parse_sampling_rates(LOG_SAMPLING).items():
+        logging.getLogger(None if name == "root" else name).addFilter(SamplingFilter(rate))
+
+    if not LOG_HOT_PATH:
+        hot_path_logger.disabled = True
+
 # Configure the logger
-configure_logger()
\ No newline at end of file
+configure_logger()
@@ -0,0 +1,176 @@
+import sys
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+from src.constants import INFERENCE_RETRY_AFTER_SECONDS
+from src.entity.config_entity import PredictionCoalescerConfig
+from src.exception import MyException, ServiceOverloadedException
+from src.logger import logging
+from src.pipline.prediction_pipeline import SpotifyData
+
+# Upper edges of the batch size histogram reported by stats()
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class PredictionCoalescer:
+    """
+    Gathers concurrent single-track prediction requests into micro-batches.
+
+    Requests wait at most `max_wait_ms` (or until `max_batch_size` requests are queued),
+    are scored together in one vectorized call, and each caller gets back its own result.
+    Batches are dispatched without waiting for the previous one to finish, so several
+    can be in flight on the inference executor at once.
+    """
+
+    def __init__(self, predict_batch: Callable[[list], Awaitable[tuple[np.ndarray, np.ndarray]]],
+                 coalescer_config: PredictionCoalescerConfig = PredictionCoalescerConfig()):
+        """
+        Args:
+            predict_batch (Callable): Coroutine function that scores a list of SpotifyData records
+                                      and returns (labels, hit_probabilities), e.g. InferenceExecutor.run
+                                      wrapped around PredictionPipeline.predict_records.
+            coalescer_config (PredictionCoalescerConfig): Batch size, wait window and queue bound.
+        """
+        self.predict_batch = predict_batch
+        self.coalescer_config = coalescer_config
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: set = set()
+
+        self.batches_scored = 0
+        self.requests_scored = 0
+        self.max_batch_size_seen = 0
+        self.last_batch_size = 0
+        self.batch_size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.batch_size_histogram["+Inf"] = 0
+
+    async def start(self) -> None:
+        """
+        Starts the background task that drains the request queue.
+        """
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.coalescer_config.max_queue_size)
+            self._worker = asyncio.create_task(self._run())
+            logging.info(f"Prediction coalescer started with {self.coalescer_config}.")
+
+    async def stop(self) -> None:
+        """
+        Cancels the background task. Requests still queued are failed.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            for task in list(self._in_flight):
+                task.cancel()
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
+            logging.info("Prediction coalescer stopped.")
+
+    async def submit(self, data: SpotifyData) -> tuple[int, float]:
+        """
+        Queues one record and waits until the batch containing it has been scored.
+
+        Returns:
+            tuple[int, float]: Predicted label and hit probability for this record.
+
+        Raises:
+            ServiceOverloadedException: If max_queue_size requests are already waiting.
+        """
+        if self._worker is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((data, future))
+        except asyncio.QueueFull:
+            raise ServiceOverloadedException(
+                f"Prediction queue is full ({self._queue.qsize()} waiting).",
+                retry_after_seconds=INFERENCE_RETRY_AFTER_SECONDS
+            )
+        return await future
+
+    async def _collect_batch(self) -> list:
+        """
+        Waits for the first request, then keeps collecting until the batch is full
+        or the wait window since that first request has elapsed.
+        """
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.coalescer_config.max_wait_ms / 1000.0
+
+        while len(batch) < self.coalescer_config.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            task = asyncio.create_task(self._score(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _score(self, batch: list) -> None:
+        records = [data for data, _ in batch]
+        futures = [future for _, future in batch]
+        try:
+            labels, probabilities = await self.predict_batch(records)
+            for future, label, probability in zip(futures, labels, probabilities):
+                if not future.done():
+                    future.set_result((int(label), float(probability)))
+            self._record_batch(len(batch))
+        except Exception as e:
+            if isinstance(e, ServiceOverloadedException):
+                logging.warning(f"Coalesced batch of {len(batch)} requests shed: {e}")
+            else:
+                logging.error(f"Coalesced batch of {len(batch)} requests failed: {e}")
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _record_batch(self, batch_size: int) -> None:
+        self.batches_scored += 1
+        self.requests_scored += batch_size
+        self.last_batch_size = batch_size
+        self.max_batch_size_seen = max(self.max_batch_size_seen, batch_size)
+        for bucket in BATCH_SIZE_BUCKETS:
+            if batch_size <= bucket:
+                self.batch_size_histogram[bucket] += 1
+                break
+        else:
+            self.batch_size_histogram["+Inf"] += 1
+
+    def stats(self) -> dict:
+        """
+        Returns queue depth and batch size statistics for tuning the wait window.
+        """
+        try:
+            return {
+                "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+                "batches_in_flight": len(self._in_flight),
+                "max_batch_size": self.coalescer_config.max_batch_size,
+                "max_wait_ms": self.coalescer_config.max_wait_ms,
+                "batches_scored": self.batches_scored,
+                "requests_scored": self.requests_scored,
+                "mean_batch_size": self.requests_scored / self.batches_scored if self.batches_scored else 0.0,
+                "max_batch_size_seen": self.max_batch_size_seen,
+                "last_batch_size": self.last_batch_size,
+                "batch_size_histogram": {str(bucket): count for bucket, count in self.batch_size_histogram.items()},
+            }
+        except Exception as e:
+            raise MyException(e, sys) from e
@@ -0,0 +1,112 @@
+import sys
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from src.entity.config_entity import InferenceExecutorConfig
+from src.exception import MyException, ServiceOverloadedException
+from src.logger import logging
+
+
+class InferenceExecutor:
+    """
+    Runs synchronous model calls (S3 load, unpickle, preprocessing, predict) on a
+    bounded thread or process pool so they never block the event loop.
+
+    At most `max_pending` calls may be queued or running at once. Further calls are
+    rejected immediately with ServiceOverloadedException instead of piling up, so
+    latency under overload degrades into fast 503s rather than unbounded queueing.
+
+    The pool is only created by start(), which the server calls once the model is
+    loaded, so process workers always fork with the model. Calls before that are
+    rejected the same way.
+    """
+
+    def __init__(self, executor_config: InferenceExecutorConfig = InferenceExecutorConfig()):
+        """
+        Args:
+            executor_config (InferenceExecutorConfig): Pool kind, worker count and queue bound.
+        """
+        try:
+            if executor_config.kind not in ("thread", "process"):
+                raise ValueError(f"Unsupported inference executor kind: {executor_config.kind}")
+            self.executor_config = executor_config
+            self._pool: Optional[Executor] = None
+            self.pending = 0
+            self.rejected = 0
+            self.completed = 0
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def start(self) -> None:
+        """
+        Creates the worker pool.
+        """
+        if self._pool is None:
+            if self.executor_config.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.executor_config.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.executor_config.max_workers,
+                                                thread_name_prefix="inference")
+            logging.info(f"Inference executor started with {self.executor_config}.")
+
+    def recycle(self) -> None:
+        """
+        Replaces process workers with fresh ones forked from the current parent state,
+        e.g. after the parent swapped in a new model. Calls already running on the old
+        workers finish there. Thread pools share the parent's model and need nothing.
+        """
+        if self.executor_config.kind == "process" and self._pool is not None:
+            old_pool = self._pool
+            self._pool = ProcessPoolExecutor(max_workers=self.executor_config.max_workers)
+            old_pool.shutdown(wait=False)
+            logging.info("Inference process workers recycled.")
+
+    def shutdown(self) -> None:
+        """
+        Waits for running calls to finish and releases the pool.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            logging.info("Inference executor shut down.")
+
+    async def run(self, fn: Callable, *args):
+        """
+        Runs fn(*args) on the pool and awaits its result.
+
+        Raises:
+            ServiceOverloadedException: If the pool is not started yet or max_pending calls
+                                        are already in flight.
+        """
+        if self._pool is None:
+            raise ServiceOverloadedException(
+                "Inference executor is not started yet; the model is still loading.",
+                retry_after_seconds=self.executor_config.retry_after_seconds
+            )
+        if self.pending >= self.executor_config.max_pending:
+            self.rejected += 1
+            raise ServiceOverloadedException(
+                f"Inference queue is full ({self.pending} pending).",
+                retry_after_seconds=self.executor_config.retry_after_seconds
+            )
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        """
+        Returns pool occupancy and load shedding counters.
+        """
+        return {
+            "kind": self.executor_config.kind,
+            "max_workers": self.executor_config.max_workers,
+            "max_pending": self.executor_config.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+from src.entity.config_entity import ModelReloaderConfig, SpotifyHitPredictorConfig
+from src.entity.s3_estimator import Proj1Estimator
+from src.logger import logging
+from src.pipline.prediction_pipeline import prepare_model
+
+
+class ModelReloader:
+    """
+    Background task that polls the ETag of the model object in S3 and hot-swaps a
+    newly pushed model into the running Proj1Estimator.
+
+    The new model is downloaded, given the configured fast paths and warmed up on a
+    worker thread, off the request path, and only then swapped in. Requests that
+    already hold the old model finish on it, and no request ever sees a cold load.
+    """
+
+    def __init__(self, estimator: Proj1Estimator,
+                 reloader_config: ModelReloaderConfig = ModelReloaderConfig(),
+                 spotify_prediction_config: SpotifyHitPredictorConfig = SpotifyHitPredictorConfig(),
+                 on_swap: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            estimator (Proj1Estimator): The estimator whose model is served.
+            reloader_config (ModelReloaderConfig): Polling settings.
+            spotify_prediction_config (SpotifyHitPredictorConfig): Warm-up and fast path settings
+                                                                    applied to each new model.
+            on_swap (Callable, optional): Called after each swap, e.g. to recycle process workers
+                                          that hold their own copy of the model.
+        """
+        self.estimator = estimator
+        self.reloader_config = reloader_config
+        self.spotify_prediction_config = spotify_prediction_config
+        self.on_swap = on_swap
+        self._task: Optional[asyncio.Task] = None
+
+        self.reloads = 0
+        self.failures = 0
+        self.last_checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.reloader_config.enabled:
+            self._task = asyncio.create_task(self._run())
+            logging.info(f"Model reloader started with {self.reloader_config}.")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.reloader_config.poll_interval_seconds)
+            await self.check_for_update()
+
+    async def check_for_update(self) -> bool:
+        """
+        Compares the S3 ETag with the served version and swaps in the new model if it changed.
+
+        Returns:
+            bool: True if a new model was swapped in.
+        """
+        try:
+            self.last_checked_at = time.time()
+            remote_version = await asyncio.to_thread(self.estimator.get_remote_version)
+            if remote_version == self.estimator.model_version:
+                return False
+
+            logging.info(f"New model version {remote_version} found (serving {self.estimator.model_version}).")
+            model, version = await asyncio.to_thread(self._fetch_and_prepare)
+            self.estimator.swap_model(model, version)
+            self.reloads += 1
+            self.last_error = None
+            logging.info(f"Swapped in model version {version}.")
+
+            if self.on_swap is not None:
+                self.on_swap()
+            return True
+
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            logging.error(f"Model reload check failed: {e}")
+            return False
+
+    def _fetch_and_prepare(self):
+        model, version = self.estimator.fetch_model()
+        prepare_model(model, self.spotify_prediction_config)
+        return model, version
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.reloader_config.enabled,
+            "poll_interval_seconds": self.reloader_config.poll_interval_seconds,
+            "model_version": self.estimator.model_version,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_checked_at": self.last_checked_at,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,115 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, List, Optional
+
+import numpy as np
+
+from src.entity.config_entity import PredictionCacheConfig
+from src.logger import logging
+
+
+class PredictionCache:
+    """
+    In-process LRU cache with a TTL for (label, hit_probability) results.
+
+    Entries are keyed on a canonical hash of a record's feature values and belong to
+    one model version; when the loaded model changes the whole cache is dropped.
+    Safe to share between inference threads.
+    """
+
+    def __init__(self, cache_config: PredictionCacheConfig = PredictionCacheConfig()):
+        """
+        Args:
+            cache_config (PredictionCacheConfig): Size, TTL and float quantization settings.
+        """
+        self.cache_config = cache_config
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_version: Optional[Hashable] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def make_key(self, values: List[float]) -> bytes:
+        """
+        Canonical key for one record's feature values, given in a fixed column order.
+        Values are packed as float64 (so 5 and 5.0 hash alike, and -0.0 equals 0.0), after
+        optional rounding to `float_decimals` so near-identical inputs share an entry.
+        """
+        packed = np.asarray(values, dtype=np.float64)
+        if self.cache_config.float_decimals is not None:
+            packed = np.round(packed, self.cache_config.float_decimals)
+        packed = packed + 0.0
+        return hashlib.blake2b(packed.tobytes(), digest_size=16).digest()
+
+    def _check_version(self, model_version: Hashable) -> None:
+        if model_version != self._model_version:
+            if self._entries:
+                self.invalidations += 1
+                logging.info(f"Model version changed to {model_version}. Dropping {len(self._entries)} cached predictions.")
+            self._entries.clear()
+            self._model_version = model_version
+
+    def get_many(self, keys: List[bytes], model_version: Hashable) -> list:
+        """
+        Looks up many keys at once.
+
+        Returns:
+            list: The cached (label, hit_probability) for each key, or None on a miss.
+        """
+        now = time.monotonic()
+        results = []
+        with self._lock:
+            self._check_version(model_version)
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and now - entry[1] > self.cache_config.ttl_seconds:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    results.append(entry[0])
+        return results
+
+    def put_many(self, keys: List[bytes], values: list, model_version: Hashable) -> None:
+        """
+        Stores (label, hit_probability) results scored by `model_version`.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(model_version)
+            for key, value in zip(keys, values):
+                self._entries[key] = (value, now)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.cache_config.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss/eviction counters for sizing the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.cache_config.max_entries,
+            "ttl_seconds": self.cache_config.ttl_seconds,
+            "float_decimals": self.cache_config.float_decimals,
+            "model_version": str(self._model_version),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -117,25 +117,168 @@
 
 
 import sys
+import numpy as np
 import pandas as pd
 from src.exception import MyException
 from src.logger import logging
 from src.entity.s3_estimator import Proj1Estimator  # Assuming this loads your model
+from src.entity.estimator import MyModel
 # from src.entity.spotify_data import SpotifyData 
-from src.entity.config_entity import SpotifyHitPredictorConfig
-import joblib
+from src.entity.config_entity import SpotifyHitPredictorConfig, PredictionCacheConfig, ShadowScoringConfig
+from src.constants import SCHEMA_FILE_PATH
+from src.pipline.prediction_cache import PredictionCache
+from src.utils.main_utils import read_yaml_file
+from src.utils.metrics import STAGE_LATENCY
 # Your data class
 import sys
 import pandas as pd
 from typing import Optional
 from src.exception import MyException
-from src.logger import logging
+from src.logger import logging, hot_path_logger
+
+class SpotifyBatch:
+    """
+    A columnar batch of tracks: one typed NumPy column per feature, in schema.yaml order.
+
+    Batches are built in bulk from JSON/Mongo documents, CSV files or DataFrames and go
+    straight into the preprocessor, without per-record objects. Indexing a batch returns
+    a SpotifyData view of one row.
+    """
+    # Feature fields in schema.yaml column order, with their schema types
+    feature_names = ("danceability", "energy", "key", "loudness", "mode", "speechiness",
+                     "acousticness", "instrumentalness", "liveness", "valence", "tempo",
+                     "duration_ms", "time_signature", "chorus_hit", "sections")
+    feature_dtypes = {name: np.float64 for name in feature_names}
+    feature_dtypes.update({name: np.int64 for name in ("key", "mode", "duration_ms", "time_signature", "sections")})
+
+    def __init__(self, columns: dict):
+        """
+        Args:
+            columns (dict): Feature name -> 1-D array-like, all of equal length.
+                            Values are cast to the schema dtype of their column.
+        """
+        try:
+            self.columns = {name: np.asarray(columns[name], dtype=self.feature_dtypes[name])
+                            for name in self.feature_names}
+            lengths = {len(column) for column in self.columns.values()}
+            if len(lengths) > 1:
+                raise ValueError(f"Feature columns have different lengths: {sorted(lengths)}")
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    @classmethod
+    def from_records(cls, records: list) -> "SpotifyBatch":
+        """
+        Builds a batch from dict-like records such as parsed JSON bodies or Mongo documents.
+        Extra keys (uri, track, _id, ...) are ignored.
+        """
+        return cls({name: [record[name] for record in records] for name in cls.feature_names})
+
+    @classmethod
+    def from_dataframe(cls, dataframe: pd.DataFrame) -> "SpotifyBatch":
+        """
+        Builds a batch from a DataFrame holding at least the feature columns.
+        """
+        return cls({name: dataframe[name].to_numpy() for name in cls.feature_names})
+
+    @classmethod
+    def from_csv(cls, filepath_or_buffer, **read_csv_kwargs) -> "SpotifyBatch":
+        """
+        Reads only the feature columns of a CSV laid out like config/schema.yaml.
+        """
+        dataframe = pd.read_csv(filepath_or_buffer, usecols=list(cls.feature_names),
+                                dtype=cls.feature_dtypes, **read_csv_kwargs)
+        return cls.from_dataframe(dataframe)
+
+    @classmethod
+    def from_spotify_data(cls, records: list["SpotifyData"]) -> "SpotifyBatch":
+        """
+        Gathers SpotifyData objects into one batch. Views over a single batch are sliced
+        out of it directly.
+        """
+        source = records[0]._batch if records else None
+        if source is not None and all(record._batch is source for record in records):
+            return source.take([record._index for record in records])
+        rows = np.array([record.values() for record in records], dtype=np.float64).reshape(-1, len(cls.feature_names))
+        return cls(dict(zip(cls.feature_names, rows.T)))
+
+    def __len__(self) -> int:
+        return len(self.columns[self.feature_names[0]])
+
+    def __getitem__(self, index: int) -> "SpotifyData":
+        return SpotifyData.view(self, index)
+
+    def take(self, indices) -> "SpotifyBatch":
+        """
+        Returns a new batch with the rows at `indices`.
+        """
+        return SpotifyBatch({name: column.take(indices) for name, column in self.columns.items()})
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns the batch as a DataFrame with the feature columns the preprocessor was fitted on.
+        """
+        return pd.DataFrame(self.columns, copy=False)
+
+    def to_array(self, columns: list = feature_names) -> np.ndarray:
+        """
+        Returns a float array with columns in `columns` order, for the compiled preprocessor.
+        """
+        return np.column_stack([self.columns[name] for name in columns]).astype(np.float64, copy=False)
+
+
+def _feature_property(name: str) -> property:
+    """
+    Builds the SpotifyData attribute for feature `name`. Reading it returns the record's
+    own value, or the batch value for a view. Assigning to a view first copies the row
+    into the record, so the batch it came from is never modified.
+    """
+    position = SpotifyBatch.feature_names.index(name)
+
+    def getter(self):
+        if self._batch is None:
+            return self._values[position]
+        return self._batch.columns[name][self._index].item()
+
+    def setter(self, value):
+        values = list(self.values())
+        values[position] = value
+        self._values = tuple(values)
+        self._batch = None
+        self._index = None
+
+    return property(getter, setter, doc=f"The track's {name}.")
+
 
 class SpotifyData:
     """
     A data class to hold a single record of Spotify audio features and track information.
     This class is designed to structure raw input data for a machine learning model.
+
+    Constructed directly it holds its own values; SpotifyBatch[i] returns a SpotifyData
+    that is a view of one row of the batch. Features are read and assigned as attributes
+    either way (see _feature_property).
     """
+    __slots__ = ("_values", "_batch", "_index")
+
+    feature_names = SpotifyBatch.feature_names
+
+    danceability = _feature_property("danceability")
+    energy = _feature_property("energy")
+    key = _feature_property("key")
+    loudness = _feature_property("loudness")
+    mode = _feature_property("mode")
+    speechiness = _feature_property("speechiness")
+    acousticness = _feature_property("acousticness")
+    instrumentalness = _feature_property("instrumentalness")
+    liveness = _feature_property("liveness")
+    valence = _feature_property("valence")
+    tempo = _feature_property("tempo")
+    duration_ms = _feature_property("duration_ms")
+    time_signature = _feature_property("time_signature")
+    chorus_hit = _feature_property("chorus_hit")
+    sections = _feature_property("sections")
+
     def __init__(self,
                 
                  danceability: float,
@@ -182,53 +325,43 @@ class SpotifyData:
                                    Defaults to None, as it's optional for new data prediction.
         """
         try:
-            self.danceability = danceability
-            self.energy = energy
-            self.key = key
-            self.loudness = loudness
-            self.mode = mode
-            self.speechiness = speechiness
-            self.acousticness = acousticness
-            self.instrumentalness = instrumentalness
-            self.liveness = liveness
-            self.valence = valence
-            self.tempo = tempo
-            self.duration_ms = duration_ms
-            self.time_signature = time_signature
-            self.chorus_hit = chorus_hit
-            self.sections = sections
-          
+            self._values = (danceability, energy, key, loudness, mode, speechiness, acousticness,
+                            instrumentalness, liveness, valence, tempo, duration_ms,
+                            time_signature, chorus_hit, sections)
+            self._batch = None
+            self._index = None
             
         except Exception as e:
             raise MyException(e, sys) from e
 
+    @classmethod
+    def view(cls, batch: SpotifyBatch, index: int) -> "SpotifyData":
+        """
+        Returns a SpotifyData backed by row `index` of `batch`, without copying.
+        """
+        data = cls.__new__(cls)
+        data._values = None
+        data._batch = batch
+        data._index = index
+        return data
+
+    def values(self) -> tuple:
+        """
+        Returns the feature values in feature_names order.
+        """
+        if self._batch is None:
+            return self._values
+        return tuple(self._batch.columns[name][self._index].item() for name in self.feature_names)
+
     def get_data_as_dict(self) -> dict:
         """
         Converts the object's attributes into a dictionary.
         This function is useful for creating a single-row DataFrame.
         """
-        logging.info("Converting SpotifyData object to a dictionary.")
+        hot_path_logger.info("Converting SpotifyData object to a dictionary.")
         try:
-            input_data = {
-               
-                "danceability": [self.danceability],
-                "energy": [self.energy],
-                "key": [self.key],
-                "loudness": [self.loudness],
-                "mode": [self.mode],
-                "speechiness": [self.speechiness],
-                "acousticness": [self.acousticness],
-                "instrumentalness": [self.instrumentalness],
-                "liveness": [self.liveness],
-                "valence": [self.valence],
-                "tempo": [self.tempo],
-                "duration_ms": [self.duration_ms],
-                "time_signature": [self.time_signature],
-                "chorus_hit": [self.chorus_hit],
-                "sections": [self.sections],
-                
-            }
-            logging.info("Successfully created dictionary.")
+            input_data = {name: [value] for name, value in zip(self.feature_names, self.values())}
+            hot_path_logger.info("Successfully created dictionary.")
             return input_data
         except Exception as e:
             logging.error("Failed to convert data to dictionary.", exc_info=True)
@@ -240,18 +373,47 @@ class SpotifyData:
         This format is ideal for model prediction.
         """
         try:
-            logging.info("Converting SpotifyData object to a DataFrame.")
-            data_dict = self.get_data_as_dict()
-            df = pd.DataFrame(data_dict)
-            logging.info("DataFrame created successfully.")
+            hot_path_logger.info("Converting SpotifyData object to a DataFrame.")
+            with STAGE_LATENCY.time("dataframe"):
+                df = SpotifyBatch.from_spotify_data([self]).to_dataframe()
+            hot_path_logger.info("DataFrame created successfully.")
             return df
         except Exception as e:
             logging.error("Failed to convert data to DataFrame.", exc_info=True)
             raise MyException(e, sys) from e
 
+    @staticmethod
+    def get_batch_as_dataframe(records: list["SpotifyData"]) -> pd.DataFrame:
+        """
+        Converts many SpotifyData objects into a single DataFrame with one row per record,
+        so a whole batch can be scored in one model call.
+        """
+        try:
+            with STAGE_LATENCY.time("dataframe"):
+                return SpotifyBatch.from_spotify_data(records).to_dataframe()
+        except Exception as e:
+            logging.error("Failed to convert batch to DataFrame.", exc_info=True)
+            raise MyException(e, sys) from e
+
+    @staticmethod
+    def get_batch_as_array(records: list["SpotifyData"], columns: list) -> np.ndarray:
+        """
+        Converts many SpotifyData objects into a float array with columns in `columns` order,
+        for the compiled preprocessor fast path that needs no DataFrame.
+        """
+        try:
+            with STAGE_LATENCY.time("dataframe"):
+                return SpotifyBatch.from_spotify_data(records).to_array(columns)
+        except Exception as e:
+            logging.error("Failed to convert batch to array.", exc_info=True)
+            raise MyException(e, sys) from e
+
+
 
 class PredictionPipeline:
     model = None   # class-level variable (shared by all instances)
+    cache = None   # class-level prediction cache, created with the model
+    challenger = None   # optional challenger estimator, scored only in the shadow of live traffic
 
     def __init__(self):
         """
@@ -265,10 +427,20 @@ class PredictionPipeline:
                     bucket_name=spotify_prediction_config.model_bucket_name,
                     model_path=spotify_prediction_config.model_file_name
                 )
+                prediction_cache_config = PredictionCacheConfig()
+                if prediction_cache_config.enabled:
+                    PredictionPipeline.cache = PredictionCache(prediction_cache_config)
+                shadow_scoring_config = ShadowScoringConfig()
+                if shadow_scoring_config.challenger_model_file_name:
+                    PredictionPipeline.challenger = Proj1Estimator(
+                        bucket_name=shadow_scoring_config.model_bucket_name,
+                        model_path=shadow_scoring_config.challenger_model_file_name
+                    )
             # PredictionPipeline.model=joblib.load("C:/Vscode/git/mlops/Spotify_tracks_classification/artifacts/08_22_2025_20_26_18/model_trainer/model.pkl")
 
             # now all instances can access this model without reloading
             self.model = PredictionPipeline.model
+            self.cache = PredictionPipeline.cache
 
         except Exception as e:
             logging.error("Failed to initialize PredictionPipeline.")
@@ -299,4 +471,148 @@ class PredictionPipeline:
 
         except Exception as e:
             logging.error("Prediction failed.")
-            raise MyException(e, sys)
\ No newline at end of file
+            raise MyException(e, sys)
+
+    def predict_batch(self, dataframe: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Scores a whole batch of tracks in one vectorized call.
+
+        Args:
+            dataframe (pd.DataFrame): One row per track, with the same feature columns
+                                      produced by SpotifyData.get_data_as_dataframe.
+                                      A float array in MyModel.input_columns order is also accepted.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Predicted labels and hit (class 1) probabilities.
+        """
+        try:
+            hot_path_logger.info("Scoring batch of %d tracks.", len(dataframe))
+            labels, probabilities = self.model.predict_with_proba(dataframe)
+            return labels, probabilities[:, -1]
+
+        except Exception as e:
+            logging.error("Batch prediction failed.")
+            raise MyException(e, sys)
+
+    def predict_records(self, records) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Scores many tracks at once, given as a SpotifyBatch or a list of SpotifyData.
+        Records already in the prediction cache are answered from it and only the misses
+        are scored. When the compiled preprocessor is enabled the misses go straight into
+        a float array; otherwise a DataFrame is built.
+        """
+        try:
+            batch = records if isinstance(records, SpotifyBatch) else SpotifyBatch.from_spotify_data(records)
+            loaded_model = self.model.get_loaded_model()
+            if self.cache is None:
+                return self._score_records(loaded_model, batch)
+
+            # Cached results are only valid for the model that produced them
+            model_version = (self.model.model_version, id(loaded_model))
+            keys = [self.cache.make_key(row) for row in batch.to_array()]
+            cached = self.cache.get_many(keys, model_version)
+            missing = [i for i, result in enumerate(cached) if result is None]
+
+            if missing:
+                labels, probabilities = self._score_records(loaded_model, batch.take(missing))
+                scored = [(label, probability) for label, probability in zip(labels.tolist(), probabilities.tolist())]
+                self.cache.put_many([keys[i] for i in missing], scored, model_version)
+                for i, result in zip(missing, scored):
+                    cached[i] = result
+
+            labels, probabilities = zip(*cached)
+            return np.array(labels), np.array(probabilities, dtype=np.float64)
+
+        except Exception as e:
+            logging.error("Record batch prediction failed.")
+            raise MyException(e, sys)
+
+    def _score_records(self, loaded_model, batch: SpotifyBatch) -> tuple[np.ndarray, np.ndarray]:
+        with STAGE_LATENCY.time("dataframe"):
+            if loaded_model.compiled_preprocessor is not None:
+                features = batch.to_array(loaded_model.input_columns)
+            else:
+                features = batch.to_dataframe()
+        labels, probabilities = loaded_model.predict_with_proba(features)
+        return labels, probabilities[:, -1]
+
+    def warm_up(self, spotify_prediction_config: SpotifyHitPredictorConfig = SpotifyHitPredictorConfig()) -> None:
+        """
+        Loads the model and runs a few synthetic batches through it, so the S3 fetch,
+        unpickling and first-call overhead of the preprocessor and model are paid
+        before real traffic arrives.
+        """
+        try:
+            logging.info("Warming up prediction pipeline.")
+            prepare_model(self.model.get_loaded_model(), spotify_prediction_config)
+            logging.info(f"Prediction pipeline warmed up with model {self.model.loaded_model}.")
+
+        except Exception as e:
+            logging.error("Prediction pipeline warm-up failed.")
+            raise MyException(e, sys)
+
+
+def prepare_model(model: MyModel, spotify_prediction_config: SpotifyHitPredictorConfig) -> MyModel:
+    """
+    Enables the configured fast paths on a freshly loaded model and runs synthetic
+    warm-up batches through it. Works on a model that is not serving yet, so a
+    replacement can be fully prepared before it is swapped in.
+    """
+    schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+    warmup_df = build_warmup_dataframe(schema_config, n_rows=spotify_prediction_config.warmup_rows)
+    model.predict_with_proba(warmup_df)
+    if spotify_prediction_config.use_compiled_preprocessor:
+        model.compile_preprocessor(warmup_df)
+    if spotify_prediction_config.use_flat_tree_evaluator:
+        model.flatten_trained_model(warmup_df)
+    for _ in range(spotify_prediction_config.warmup_rounds):
+        model.predict_with_proba(warmup_df)
+    return model
+
+
+def build_warmup_dataframe(schema_config: dict, n_rows: int) -> pd.DataFrame:
+    """
+    Builds synthetic feature rows from schema.yaml: numerical features are spread across
+    their `rules.numerical_ranges` bounds and categorical features cycle through their
+    allowed `rules.categorical_values`, so warm-up touches realistic tree paths.
+
+    Args:
+        schema_config (dict): Parsed schema.yaml.
+        n_rows (int): Number of synthetic rows to build.
+
+    Returns:
+        pd.DataFrame: Feature columns in schema order, without dropped or target columns.
+    """
+    rules = schema_config.get("rules", {})
+    numerical_ranges = rules.get("numerical_ranges", {})
+    categorical_values = rules.get("categorical_values", {})
+    excluded = set(schema_config["columns_to_drop"]) | set(schema_config["target_column"])
+    feature_columns = [column for column in schema_config["columns"] if column not in excluded]
+
+    data = {}
+    for column in feature_columns:
+        if column in schema_config["categorical_features"]:
+            allowed = categorical_values.get(column, [0])
+            data[column] = [allowed[i % len(allowed)] for i in range(n_rows)]
+        else:
+            low, high = numerical_ranges.get(column, [0.0, 1.0])
+            data[column] = np.linspace(low, high, n_rows + 2)[1:-1]
+            if schema_config["columns"][column] == "int":
+                data[column] = data[column].round().astype(int)
+    return pd.DataFrame(data)
+
+
+def score_batch(dataframe: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Module-level entry point for PredictionPipeline.predict_batch, so it can be
+    shipped to thread or process pool workers. Each process keeps its own
+    class-level model, loaded on first use.
+    """
+    return PredictionPipeline().predict_batch(dataframe)
+
+
+def score_records(records) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Module-level entry point for PredictionPipeline.predict_records (see score_batch).
+    """
+    return PredictionPipeline().predict_records(records)
@@ -0,0 +1,198 @@
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from src.configuration.aws_connection import S3Client
+from src.constants import SERVING_WORKERS
+from src.entity.config_entity import ModelReloaderConfig, SpotifyHitPredictorConfig
+from src.exception import MyException
+from src.logger import logging
+from src.pipline.prediction_pipeline import PredictionPipeline, prepare_model
+
+# True in forked workers, where the master owns model reloads
+_in_worker = False
+
+
+def is_prefork_worker() -> bool:
+    """
+    Whether this process is a worker forked by serve(). Workers must not reload the
+    model themselves: a private copy would undo the copy-on-write sharing.
+    """
+    return _in_worker
+
+
+def _reset_s3_client() -> None:
+    # boto3 clients hold connection pools that must not be shared across fork, so each
+    # worker creates its own on first use (e.g. a model reload)
+    S3Client.s3_client = None
+    S3Client.s3_resource = None
+
+
+def _warm_up_until_loaded(spotify_prediction_config: SpotifyHitPredictorConfig) -> None:
+    """
+    Loads and warms the model in the master, retrying like the lifespan warm-up does
+    until it succeeds.
+    """
+    while True:
+        try:
+            PredictionPipeline().warm_up(spotify_prediction_config)
+            return
+        except Exception as e:
+            logging.error(f"Model warm-up failed, retrying in {spotify_prediction_config.warmup_retry_seconds}s: {e}")
+            time.sleep(spotify_prediction_config.warmup_retry_seconds)
+
+
+def _reload_if_changed(spotify_prediction_config: SpotifyHitPredictorConfig) -> bool:
+    """
+    Swaps a newly pushed model into the master, prepared and warmed like the first one.
+
+    Returns:
+        bool: True if a new model was swapped in.
+    """
+    estimator = PredictionPipeline.model
+    try:
+        remote_version = estimator.get_remote_version()
+        if remote_version == estimator.model_version:
+            return False
+
+        logging.info(f"New model version {remote_version} found (serving {estimator.model_version}).")
+        model, version = estimator.fetch_model()
+        prepare_model(model, spotify_prediction_config)
+        estimator.swap_model(model, version)
+    except Exception as e:
+        logging.error(f"Model reload check failed: {e}")
+        return False
+
+    # Let the old model be collected, then freeze the new one for the next workers
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
+    logging.info(f"Swapped in model version {version}.")
+    return True
+
+
+def serve(app, host: str, port: int, workers: int = SERVING_WORKERS,
+          spotify_prediction_config: SpotifyHitPredictorConfig = SpotifyHitPredictorConfig(),
+          reloader_config: ModelReloaderConfig = ModelReloaderConfig()) -> None:
+    """
+    Runs the API with `workers` uvicorn processes.
+
+    With more than one worker the master binds the listening socket, loads and warms the
+    model once (retrying until it succeeds), freezes the garbage collector and forks the
+    workers. Binding first means clients connecting during the load wait in the listen
+    backlog instead of being refused. The workers
+    inherit the model pages copy-on-write, so memory grows far slower than one model
+    per process. gc.freeze() moves everything loaded so far out of the collector's
+    generations, so collections in the workers do not write to (and copy) those pages.
+    Each worker drops the inherited S3 clients and opens its own. The master restarts
+    workers that die and forwards SIGTERM/SIGINT to them.
+
+    Workers do not reload the model. When reloads are enabled the master polls S3 for a
+    new model, loads and warms it, then forks a fresh set of workers and gracefully stops
+    the old ones, so every worker keeps sharing one copy of the current model.
+
+    Args:
+        app: The ASGI application.
+        host (str): Address to bind.
+        port (int): Port to bind.
+        workers (int): Number of worker processes; 1 runs a plain single-process server.
+        spotify_prediction_config (SpotifyHitPredictorConfig): Warm-up and fast path settings.
+        reloader_config (ModelReloaderConfig): Model reload polling settings for the master.
+    """
+    if workers <= 1 or not hasattr(os, "fork"):
+        uvicorn.run(app, host=host, port=port)
+        return
+
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        logging.info(f"Pre-fork master {os.getpid()} listening on {host}:{port}; loading the model.")
+
+        _warm_up_until_loaded(spotify_prediction_config)
+        gc.collect()
+        gc.freeze()
+        logging.info(f"Model loaded; starting {workers} workers.")
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+    children = set()
+    retiring = set()
+    stopping = False
+
+    def spawn_worker() -> None:
+        global _in_worker
+        pid = os.fork()
+        if pid == 0:
+            _in_worker = True
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            _reset_s3_client()
+            server = uvicorn.Server(uvicorn.Config(app, host=host, port=port))
+            server.run(sockets=[sock])
+            os._exit(0)
+        children.add(pid)
+        logging.info(f"Started worker {pid}.")
+
+    def stop_workers(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+
+    def replace_workers() -> None:
+        # New workers share the listening socket, so the old ones can finish their
+        # in-flight requests while the new ones already accept connections
+        old_workers = set(children)
+        for _ in range(workers):
+            spawn_worker()
+        for pid in old_workers:
+            retiring.add(pid)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        logging.info(f"Replacing workers {sorted(old_workers)} to serve the new model.")
+
+    for _ in range(workers):
+        spawn_worker()
+
+    next_reload_check = time.monotonic() + reloader_config.poll_interval_seconds
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        if pid == 0:
+            if reloader_config.enabled and not stopping and time.monotonic() >= next_reload_check:
+                if _reload_if_changed(spotify_prediction_config):
+                    replace_workers()
+                next_reload_check = time.monotonic() + reloader_config.poll_interval_seconds
+            time.sleep(0.5)
+            continue
+        children.discard(pid)
+        if pid in retiring:
+            retiring.discard(pid)
+        elif not stopping:
+            logging.error(f"Worker {pid} exited with status {status}. Restarting it.")
+            # Avoid a hot fork loop if workers crash right after starting
+            time.sleep(1)
+            spawn_worker()
+
+    sock.close()
+    logging.info("Pre-fork master stopped.")
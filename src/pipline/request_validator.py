@@ -0,0 +1,84 @@
+import sys
+from typing import List, Tuple
+
+import numpy as np
+
+from src.constants import SCHEMA_FILE_PATH
+from src.exception import MyException
+from src.utils.main_utils import read_yaml_file
+
+
+class RequestValidator:
+    """
+    The `rules` of config/schema.yaml compiled into NumPy checks over a whole batch of
+    feature rows: every value must be finite, `numerical_ranges` become one vectorized
+    bounds comparison and `categorical_values` one membership test per column.
+
+    A valid batch costs a handful of array operations; Python only runs per reported error.
+    """
+
+    def __init__(self, feature_names: Tuple[str, ...], ranges: dict, categories: dict):
+        """
+        Args:
+            feature_names (Tuple[str, ...]): Column order of the arrays passed to validate.
+            ranges (dict): Feature name -> (low, high), inclusive.
+            categories (dict): Feature name -> allowed values.
+        """
+        self.feature_names = tuple(feature_names)
+        n_features = len(self.feature_names)
+
+        # Unbounded columns get the widest finite limits, so one comparison checks every
+        # bound and also rejects NaN and infinities
+        self.low = np.full(n_features, -np.finfo(np.float64).max)
+        self.high = np.full(n_features, np.finfo(np.float64).max)
+        self.messages = ["must be a finite number"] * n_features
+        for name, (low, high) in ranges.items():
+            if name in self.feature_names:
+                index = self.feature_names.index(name)
+                self.low[index], self.high[index] = low, high
+                self.messages[index] = f"must be between {low} and {high}"
+
+        self.categorical_indices = []
+        self.categorical_values = []
+        for name, allowed in categories.items():
+            if name in self.feature_names:
+                index = self.feature_names.index(name)
+                self.categorical_indices.append(index)
+                self.categorical_values.append(np.array(sorted(allowed), dtype=np.float64))
+                self.messages[index] = f"must be one of {sorted(allowed)}"
+
+    @classmethod
+    def from_schema(cls, feature_names: Tuple[str, ...], schema_file_path: str = SCHEMA_FILE_PATH) -> "RequestValidator":
+        """
+        Compiles the serving-time checks from the `rules` section of schema.yaml.
+        """
+        try:
+            rules = read_yaml_file(schema_file_path).get("rules", {})
+            return cls(feature_names, rules.get("numerical_ranges", {}), rules.get("categorical_values", {}))
+        except Exception as e:
+            raise MyException(e, sys) from e
+
+    def validate(self, features: np.ndarray) -> List[Tuple[int, str, str, float]]:
+        """
+        Checks a (n_rows, len(feature_names)) float array in one pass.
+
+        Returns:
+            List[Tuple[int, str, str, float]]: (row, field, message, value) for every invalid
+                                               value, ordered by row then field; empty if valid.
+        """
+        features = np.asarray(features, dtype=np.float64).reshape(-1, len(self.feature_names))
+        invalid = ~((features >= self.low) & (features <= self.high))
+        for index, allowed in zip(self.categorical_indices, self.categorical_values):
+            values = features[:, index]
+            positions = np.minimum(np.searchsorted(allowed, values), len(allowed) - 1)
+            invalid[:, index] |= allowed[positions] != values
+
+        if not invalid.any():
+            return []
+        nonfinite = ~np.isfinite(features)
+        return [
+            (int(row), self.feature_names[column],
+             "must be a finite number" if nonfinite[row, column] else self.messages[column],
+             float(features[row, column]))
+            for row, column in zip(*np.nonzero(invalid))
+        ]
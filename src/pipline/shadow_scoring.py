@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.entity.config_entity import ShadowScoringConfig, SpotifyHitPredictorConfig
+from src.entity.s3_estimator import Proj1Estimator
+from src.logger import logging
+from src.pipline.prediction_pipeline import SpotifyBatch, prepare_model
+from src.utils.metrics import Histogram
+
+SHADOW_LATENCY = Histogram(
+    "spotify_shadow_latency_seconds",
+    "Time to score a sampled batch, per model, in shadow comparisons.",
+    label_name="model",
+)
+
+
+class ShadowScorer:
+    """
+    Scores a sample of live batches with both the champion and a challenger model
+    on a single background thread, after the response has been sent, and tracks how
+    often they agree and how long each takes on the same inputs.
+
+    At most `max_pending` sampled batches wait at once; further samples are dropped,
+    so shadow work never queues up behind a traffic spike. It shares the CPU with
+    serving, which `sample_rate` keeps in proportion.
+    """
+
+    def __init__(self, champion: Proj1Estimator, challenger: Proj1Estimator,
+                 shadow_config: ShadowScoringConfig = ShadowScoringConfig(),
+                 spotify_prediction_config: SpotifyHitPredictorConfig = SpotifyHitPredictorConfig()):
+        """
+        Args:
+            champion (Proj1Estimator): The estimator serving live traffic.
+            challenger (Proj1Estimator): The estimator under evaluation.
+            shadow_config (ShadowScoringConfig): Sampling rate and queue bound.
+            spotify_prediction_config (SpotifyHitPredictorConfig): Fast path settings applied to
+                                                                    the challenger, as for the champion.
+        """
+        self.champion = champion
+        self.challenger = challenger
+        self.shadow_config = shadow_config
+        self.spotify_prediction_config = spotify_prediction_config
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._prepared_challenger = None
+
+        self.pending = 0
+        self.batches = 0
+        self.rows = 0
+        self.agreements = 0
+        self.probability_abs_diff_sum = 0.0
+        self.dropped = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+            logging.info(f"Shadow scoring started with {self.shadow_config}.")
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def submit(self, records) -> bool:
+        """
+        Samples a live batch (a SpotifyBatch, list of SpotifyData or feature DataFrame)
+        for comparison. Never blocks.
+
+        Returns:
+            bool: True if the batch was queued for shadow scoring.
+        """
+        if self._pool is None or random.random() >= self.shadow_config.sample_rate:
+            return False
+        with self._lock:
+            if self.pending >= self.shadow_config.max_pending:
+                self.dropped += 1
+                return False
+            self.pending += 1
+        self._pool.submit(self._compare, records)
+        return True
+
+    def _compare(self, records) -> None:
+        try:
+            if isinstance(records, pd.DataFrame):
+                features = records
+            else:
+                batch = records if isinstance(records, SpotifyBatch) else SpotifyBatch.from_spotify_data(records)
+                features = batch.to_dataframe()
+
+            champion_model = self.champion.get_loaded_model()
+            challenger_model = self.challenger.get_loaded_model()
+            if self._prepared_challenger is not challenger_model:
+                prepare_model(challenger_model, self.spotify_prediction_config)
+                self._prepared_challenger = challenger_model
+
+            start = time.perf_counter()
+            champion_labels, champion_probabilities = champion_model.predict_with_proba(features)
+            champion_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            challenger_labels, challenger_probabilities = challenger_model.predict_with_proba(features)
+            challenger_seconds = time.perf_counter() - start
+
+            SHADOW_LATENCY.observe("champion", champion_seconds)
+            SHADOW_LATENCY.observe("challenger", challenger_seconds)
+            with self._lock:
+                self.batches += 1
+                self.rows += len(features)
+                self.agreements += int(np.sum(champion_labels == challenger_labels))
+                self.probability_abs_diff_sum += float(
+                    np.abs(champion_probabilities[:, -1] - challenger_probabilities[:, -1]).sum()
+                )
+
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+                first_failure = self.last_error is None
+                self.last_error = str(e)
+            if first_failure:
+                logging.warning(f"Shadow scoring failed: {e}")
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def stats(self) -> dict:
+        """
+        Returns agreement and sampling counters. Latency is exported on /metrics.
+        """
+        with self._lock:
+            return {
+                "challenger_model": self.challenger.model_path,
+                "challenger_version": self.challenger.model_version,
+                "sample_rate": self.shadow_config.sample_rate,
+                "batches": self.batches,
+                "rows": self.rows,
+                "agreement_rate": self.agreements / self.rows if self.rows else None,
+                "mean_probability_abs_diff": self.probability_abs_diff_sum / self.rows if self.rows else None,
+                "pending": self.pending,
+                "dropped": self.dropped,
+                "failures": self.failures,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,266 @@
+import csv
+import io
+import json
+from collections import defaultdict
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from src.constants import PREDICTION_STREAM_MAX_LINE_BYTES
+from src.logger import hot_path_logger
+from src.pipline.prediction_pipeline import SpotifyData
+from src.pipline.request_validator import RequestValidator
+from src.utils.metrics import STAGE_LATENCY
+
+# Optional track identifier echoed back next to each prediction
+ID_COLUMN = "uri"
+
+
+class LineTooLongError(ValueError):
+    """
+    Raised when an upload line exceeds the configured maximum length.
+    """
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for endpoints that keep reading the request body while the
+    response is being sent. Under ASGI spec versions before 2.4 (e.g. uvicorn),
+    starlette's StreamingResponse runs a disconnect listener that calls receive()
+    concurrently and discards the body messages it gets, so parts of the upload would
+    be lost. This response only sends; the body reader itself sees the disconnect
+    (as ClientDisconnect) when the client goes away.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+class StreamScorer:
+    """
+    Scores a CSV or NDJSON upload laid out like config/schema.yaml while it is still
+    being received.
+
+    The body is read line by line; every `chunk_rows` rows are parsed into a DataFrame,
+    scored in one vectorized call and written out before more of the body is read.
+    At most one chunk is held in memory, and a slow reader on either side applies
+    backpressure through the socket. CSV rows are split on newlines, so quoted fields
+    must not contain line breaks. Lines longer than `max_line_bytes` stop the upload,
+    so a body without newlines cannot grow the line buffer without bound.
+
+    Output mirrors the input format: CSV rows or JSON lines with `row` (0-based input
+    position), `uri` (when the input has one), `label`, `hit_probability` and `error`.
+    Rows failing validation (including NDJSON rows missing a feature) and lines that do
+    not parse (malformed JSON, CSV rows with the wrong number of fields) are not scored;
+    their `error` says why. An upload stopped by an overlong line ends with one extra
+    row whose `error` says so.
+    """
+
+    def __init__(self, body: AsyncIterator[bytes], input_format: str,
+                 score_chunk: Callable[[pd.DataFrame], Awaitable[tuple]], chunk_rows: int,
+                 validator: Optional[RequestValidator] = None,
+                 max_line_bytes: int = PREDICTION_STREAM_MAX_LINE_BYTES):
+        """
+        Args:
+            body (AsyncIterator[bytes]): The raw request body, e.g. Request.stream().
+            input_format (str): "csv" or "ndjson".
+            score_chunk (Callable): Async callable returning (labels, hit probabilities) for a
+                                    DataFrame of feature columns.
+            chunk_rows (int): Rows parsed and scored per chunk.
+            validator (RequestValidator, optional): Schema rules checked on every row.
+            max_line_bytes (int): Longest line accepted.
+        """
+        if input_format not in ("csv", "ndjson"):
+            raise ValueError(f"Unsupported upload format: {input_format}")
+        self.input_format = input_format
+        self.score_chunk = score_chunk
+        self.chunk_rows = chunk_rows
+        self.validator = validator
+        self.feature_columns = list(SpotifyData.feature_names)
+
+        self.max_line_bytes = max_line_bytes
+
+        self._lines = self._iter_lines(body, max_line_bytes)
+        self._header: Optional[bytes] = None
+        self._header_width = 0
+        self._first_line: Optional[bytes] = None
+        self._has_ids = False
+        self.rows_scored = 0
+
+    @staticmethod
+    async def _iter_lines(body: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[bytes]:
+        pending = b""
+        async for data in body:
+            pending += data
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                if len(line) > max_line_bytes:
+                    break
+                if line.strip():
+                    yield line.rstrip(b"\r")
+            if len(pending) > max_line_bytes or any(len(line) > max_line_bytes for line in lines):
+                raise LineTooLongError(f"Upload has a line longer than {max_line_bytes} bytes.")
+        if pending.strip():
+            yield pending.rstrip(b"\r")
+
+    async def start(self) -> None:
+        """
+        Reads up to the first row and checks that every feature column is present,
+        so a malformed upload is rejected before any response is sent.
+
+        Raises:
+            ValueError: If the body is empty, its first line is too long or feature columns
+                        are missing.
+        """
+        try:
+            first = await self._lines.__anext__()
+        except StopAsyncIteration:
+            raise ValueError("Upload is empty.")
+        if self.input_format == "csv":
+            self._header = first
+            columns = pd.read_csv(io.BytesIO(first), nrows=0).columns
+            self._header_width = len(columns)
+        else:
+            self._first_line = first
+            record = json.loads(first)
+            if not isinstance(record, dict):
+                raise ValueError("NDJSON lines must be JSON objects.")
+            columns = record.keys()
+        self._has_ids = ID_COLUMN in columns
+
+        missing = [column for column in self.feature_columns if column not in columns]
+        if missing:
+            raise ValueError(f"Upload is missing feature columns: {missing}")
+
+    async def _chunks(self) -> AsyncIterator[List[bytes]]:
+        chunk = [self._first_line] if self._first_line is not None else []
+        try:
+            async for line in self._lines:
+                chunk.append(line)
+                if len(chunk) >= self.chunk_rows:
+                    yield chunk
+                    chunk = []
+        except LineTooLongError:
+            # Score the rows read before the overlong line, then stop
+            if chunk:
+                yield chunk
+            raise
+        if chunk:
+            yield chunk
+
+    def _parse(self, lines: List[bytes]) -> Tuple[pd.DataFrame, dict]:
+        """
+        Parses a chunk into a DataFrame with one row per line. Lines that do not parse
+        become empty rows and are returned as {row position in chunk: error message},
+        so a bad line costs only its own row, not the chunk or the upload.
+        """
+        if self.input_format == "csv":
+            return self._parse_csv(lines)
+        return self._parse_ndjson(lines)
+
+    @staticmethod
+    def _parse_ndjson(lines: List[bytes]) -> Tuple[pd.DataFrame, dict]:
+        records, errors = [], {}
+        for row, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record, errors[row] = {}, f"invalid JSON: {e}"
+            else:
+                if not isinstance(record, dict):
+                    record, errors[row] = {}, "line is not a JSON object"
+            records.append(record)
+        return pd.DataFrame.from_records(records), errors
+
+    def _parse_csv(self, lines: List[bytes]) -> Tuple[pd.DataFrame, dict]:
+        # Each line is checked on its own, so an unbalanced quote cannot swallow the next rows
+        errors = {}
+        for row, line in enumerate(lines):
+            try:
+                width = len(next(csv.reader([line.decode()], strict=True)))
+            except (csv.Error, UnicodeDecodeError) as e:
+                errors[row] = f"invalid CSV row: {e}"
+                continue
+            if width != self._header_width:
+                errors[row] = f"invalid CSV row: expected {self._header_width} fields, got {width}"
+        if errors:
+            empty_row = b"," * (self._header_width - 1)
+            lines = [empty_row if row in errors else line for row, line in enumerate(lines)]
+
+        try:
+            dataframe = pd.read_csv(io.BytesIO(self._header + b"\n" + b"\n".join(lines)), skip_blank_lines=False)
+            if len(dataframe) != len(lines):
+                raise ValueError(f"parsed {len(dataframe)} rows from {len(lines)} lines")
+        except ValueError as e:
+            # Anything the line checks missed fails this chunk's rows, not the whole upload
+            return pd.DataFrame(index=range(len(lines))), {row: f"invalid CSV chunk: {e}" for row in range(len(lines))}
+        return dataframe, errors
+
+    def _validate(self, features: pd.DataFrame) -> dict:
+        """
+        Returns {row position in chunk: error message} for rows breaking the schema rules.
+        Values that are not numbers are reported as non-finite.
+        """
+        if self.validator is None:
+            return {}
+        numeric = features.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+        messages = defaultdict(list)
+        for row, field, message, _ in self.validator.validate(numeric):
+            messages[row].append(f"{field} {message}")
+        return {row: "; ".join(errors) for row, errors in messages.items()}
+
+    async def _score(self, features: pd.DataFrame, errors: dict) -> tuple:
+        labels = pd.array([None] * len(features), dtype="Int64")
+        probabilities = np.full(len(features), np.nan)
+        valid = np.ones(len(features), dtype=bool)
+        valid[list(errors)] = False
+        if valid.any():
+            valid_labels, valid_probabilities = await self.score_chunk(features[valid].reset_index(drop=True))
+            labels[valid] = valid_labels
+            probabilities[valid] = valid_probabilities
+        return labels, probabilities
+
+    def _format(self, dataframe: pd.DataFrame, labels, probabilities: np.ndarray, errors: dict) -> bytes:
+        output = pd.DataFrame({"row": np.arange(self.rows_scored, self.rows_scored + len(dataframe))})
+        if ID_COLUMN in dataframe.columns:
+            output[ID_COLUMN] = dataframe[ID_COLUMN].to_numpy()
+        output["label"] = labels
+        output["hit_probability"] = probabilities
+        output["error"] = [errors.get(row) for row in range(len(dataframe))]
+
+        if self.input_format == "csv":
+            return output.to_csv(index=False, header=self.rows_scored == 0).encode()
+        return output.to_json(orient="records", lines=True).rstrip("\n").encode() + b"\n"
+
+    def _format_abort(self, message: str) -> bytes:
+        # One unscored row after the last one read, carrying why the upload stopped
+        dataframe = pd.DataFrame({ID_COLUMN: [None]}) if self._has_ids else pd.DataFrame(index=range(1))
+        return self._format(dataframe, pd.array([None], dtype="Int64"), np.array([np.nan]), {0: message})
+
+    async def results(self) -> AsyncIterator[bytes]:
+        """
+        Yields the formatted predictions chunk by chunk. Call start() first.
+        """
+        try:
+            async for lines in self._chunks():
+                with STAGE_LATENCY.time("request_parsing"):
+                    dataframe, parse_errors = self._parse(lines)
+                # NDJSON rows may omit features; those become NaN and fail validation per row
+                features = dataframe.reindex(columns=self.feature_columns)
+                errors = {**self._validate(features), **parse_errors}
+                labels, probabilities = await self._score(features, errors)
+                yield self._format(dataframe, labels, probabilities, errors)
+                self.rows_scored += len(dataframe)
+        except LineTooLongError as e:
+            hot_path_logger.warning("Stopped streamed upload after %d tracks: %s", self.rows_scored, e)
+            yield self._format_abort(str(e))
+            return
+        hot_path_logger.info("Streamed predictions for %d uploaded tracks.", self.rows_scored)
@@ -0,0 +1,185 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.pipline.prediction_pipeline import SpotifyBatch
+
+# Binary request/response formats for high-volume scoring clients. pyarrow and msgpack
+# are imported on first use so JSON-only deployments do not pay for them at startup.
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+ID_COLUMN = "uri"
+# Media types (and the wildcards that fall back to JSON) mapped to the format names used by the decoders
+FORMAT_BY_MEDIA_TYPE = {
+    ARROW_MEDIA_TYPE: "arrow",
+    **{media_type: "msgpack" for media_type in MSGPACK_MEDIA_TYPES},
+    "application/json": "json",
+    "application/*": "json",
+    "*/*": "json",
+}
+
+
+class UnsupportedFormatError(Exception):
+    """
+    Raised when a binary format is requested but its library is not installed.
+    """
+
+
+def negotiate(media_type_header: Optional[str]) -> str:
+    """
+    Maps a Content-Type or Accept header to "arrow", "msgpack" or "json". Of the media
+    ranges in an Accept header, the supported one with the highest q-value wins (the
+    first on ties); ranges with q=0 are never chosen. Anything unsupported means JSON.
+    """
+    best_format, best_quality = "json", 0.0
+    for media_range in (media_type_header or "").lower().split(","):
+        media_type, *parameters = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        format_name = FORMAT_BY_MEDIA_TYPE.get(media_type)
+        if format_name is not None and quality > best_quality:
+            best_format, best_quality = format_name, quality
+    return best_format
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        return pyarrow
+    except ImportError as e:
+        raise UnsupportedFormatError("Arrow bodies require the pyarrow package.") from e
+
+
+def _import_msgpack():
+    try:
+        import msgpack
+        return msgpack
+    except ImportError as e:
+        raise UnsupportedFormatError("msgpack bodies require the msgpack package.") from e
+
+
+def _to_batch(columns: dict, source: str) -> SpotifyBatch:
+    """
+    Builds a SpotifyBatch after checking that integer features hold whole numbers, which
+    the int64 cast would otherwise silently truncate (JSON bodies reject them as well).
+    """
+    for name, dtype in SpotifyBatch.feature_dtypes.items():
+        if dtype is not np.int64:
+            continue
+        values = np.asarray(columns[name])
+        if values.dtype.kind in "iub":
+            continue
+        try:
+            values = values.astype(np.float64)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{source} feature '{name}' must hold integers.") from e
+        if not (np.isfinite(values).all() and (values % 1 == 0).all()):
+            raise ValueError(f"{source} feature '{name}' must hold integers, got missing or non-integral values.")
+    return SpotifyBatch(columns)
+
+
+def _check_uris(uris, rows: int, source: str) -> Optional[List[Optional[str]]]:
+    """
+    Checks that track identifiers are a list of strings (or nulls) with one entry per
+    track, so they line up with the predictions they are echoed next to.
+    """
+    if uris is None:
+        return None
+    if not isinstance(uris, list) or len(uris) != rows:
+        raise ValueError(f"{source} '{ID_COLUMN}' must be a list with one entry per track.")
+    if not all(uri is None or isinstance(uri, str) for uri in uris):
+        raise ValueError(f"{source} '{ID_COLUMN}' values must be strings.")
+    return uris
+
+
+def decode_arrow(body: bytes) -> Tuple[SpotifyBatch, Optional[List[str]]]:
+    """
+    Reads an Arrow IPC stream with one column per feature (and optionally `uri`).
+    Single-chunk float64/int64 columns are used without copying; other types or
+    chunkings cost one copy.
+
+    Raises:
+        ValueError: If a feature column is missing, contains nulls or holds non-integral
+                    values for an integer feature, or `uri` is not a string column.
+    """
+    pa = _import_pyarrow()
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+
+    columns = {}
+    for name in SpotifyBatch.feature_names:
+        if name not in table.column_names:
+            raise ValueError(f"Arrow table is missing feature column '{name}'.")
+        column = table.column(name)
+        if column.null_count:
+            raise ValueError(f"Arrow column '{name}' contains nulls.")
+        columns[name] = column.to_numpy()
+
+    uris = table.column(ID_COLUMN).to_pylist() if ID_COLUMN in table.column_names else None
+    return _to_batch(columns, "Arrow"), _check_uris(uris, table.num_rows, "Arrow")
+
+
+def encode_arrow(uris: Optional[List[str]], labels: np.ndarray, probabilities: np.ndarray) -> bytes:
+    """
+    Writes predictions as an Arrow IPC stream with `uri` (if given), `label` and `hit_probability`.
+    """
+    pa = _import_pyarrow()
+    data = {} if uris is None else {ID_COLUMN: pa.array(uris, type=pa.string())}
+    data["label"] = pa.array(np.asarray(labels, dtype=np.int64))
+    data["hit_probability"] = pa.array(np.asarray(probabilities, dtype=np.float64))
+    table = pa.table(data)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_msgpack(body: bytes) -> Tuple[SpotifyBatch, Optional[List[str]]]:
+    """
+    Reads a msgpack map, either columnar ({"danceability": [...], ..., "uri": [...]})
+    or row-wise like the JSON body ({"tracks": [{...}, ...]}).
+
+    Raises:
+        ValueError: If the body is not a map, `tracks` is not a list of maps, a feature is
+                    missing, an integer feature holds non-integral values or `uri` is not
+                    one string (or nil) per track.
+    """
+    msgpack = _import_msgpack()
+    payload = msgpack.unpackb(body)
+    if not isinstance(payload, dict):
+        raise ValueError("msgpack body must be a map.")
+
+    try:
+        if "tracks" in payload:
+            tracks = payload["tracks"]
+            if not isinstance(tracks, list) or not all(isinstance(track, dict) for track in tracks):
+                raise ValueError("msgpack 'tracks' must be a list of maps.")
+            uris = _check_uris([track.get(ID_COLUMN) for track in tracks], len(tracks), "msgpack")
+            columns = {name: [track[name] for track in tracks] for name in SpotifyBatch.feature_names}
+            return _to_batch(columns, "msgpack"), uris
+        columns = {name: payload[name] for name in SpotifyBatch.feature_names}
+        batch = _to_batch(columns, "msgpack")
+        return batch, _check_uris(payload.get(ID_COLUMN), len(batch), "msgpack")
+    except KeyError as e:
+        raise ValueError(f"msgpack body is missing feature {e}.") from e
+
+
+def encode_msgpack(uris: Optional[List[str]], labels: np.ndarray, probabilities: np.ndarray) -> bytes:
+    """
+    Writes predictions as a columnar msgpack map.
+    """
+    msgpack = _import_msgpack()
+    return msgpack.packb({
+        "count": len(labels),
+        ID_COLUMN: uris,
+        "label": np.asarray(labels).tolist(),
+        "hit_probability": np.asarray(probabilities, dtype=np.float64).tolist(),
+    })
@@ -0,0 +1,210 @@
+import os
+import sys
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.exception import MyException
+from src.logger import logging
+from src.utils.main_utils import schema_read_dtypes
+
+# Resolution of the per-class hash histograms used for stratified thresholds
+HASH_BUCKETS = 1 << 16
+
+
+def hash_fractions(keys: np.ndarray) -> np.ndarray:
+    """
+    Maps keys to floats in [0, 1) with pandas' fixed-key SipHash, which gives the same
+    value for the same key in every process and run.
+    """
+    hashes = pd.util.hash_array(np.asarray(keys, dtype=object), categorize=False)
+    return (hashes >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+
+class HashSplitter:
+    """
+    Deterministic train/test assignment by a hash of a key column (the track `uri`):
+    a row goes to test when its hash fraction is below the test ratio. A track stays on
+    the same side across runs however much the collection grows, and rows are assigned
+    one at a time, so the data can be split in streaming chunks.
+
+    With a `stratify_column`, each class gets its own threshold, chosen in a first pass
+    over the keys so that exactly `test_ratio` of the class (to 1/65536 of its hash space)
+    lands in test. Thresholds then move slightly as data is added, so only tracks whose
+    hash lies between the old and new threshold of their class can change sides.
+    """
+
+    def __init__(self, test_ratio: float, stratify_column: Optional[str] = None):
+        """
+        Args:
+            test_ratio (float): Share of rows assigned to test.
+            stratify_column (Optional[str]): Class column (e.g. "target") to stratify on.
+        """
+        self.test_ratio = test_ratio
+        self.stratify_column = stratify_column
+        self.class_thresholds: Dict = {}
+        self._bucket_counts: Dict = {}
+
+    def observe(self, fractions: np.ndarray, labels: np.ndarray) -> None:
+        """
+        First pass for stratified splits: adds a chunk's hash fractions per class.
+        """
+        buckets = np.minimum((fractions * HASH_BUCKETS).astype(np.int64), HASH_BUCKETS - 1)
+        for label in np.unique(labels):
+            counts = self._bucket_counts.setdefault(label.item(), np.zeros(HASH_BUCKETS, dtype=np.int64))
+            counts += np.bincount(buckets[labels == label], minlength=HASH_BUCKETS)
+
+    def finish_observing(self) -> None:
+        for label, counts in self._bucket_counts.items():
+            cumulative = np.cumsum(counts)
+            quota = int(round(self.test_ratio * cumulative[-1]))
+            # the first buckets that together hold the class's test quota go to test
+            bucket = int(np.searchsorted(cumulative, quota))
+            self.class_thresholds[label] = (bucket + 1) / HASH_BUCKETS if quota else 0.0
+        self._bucket_counts = {}
+
+    def test_mask(self, fractions: np.ndarray, labels: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Returns True for the rows assigned to test.
+        """
+        if not self.class_thresholds or labels is None:
+            return fractions < self.test_ratio
+        # classes first seen after the first pass fall back to the plain ratio
+        thresholds = np.full(len(fractions), self.test_ratio)
+        for label, threshold in self.class_thresholds.items():
+            thresholds[labels == label] = threshold
+        return fractions < thresholds
+
+
+def _iter_chunks(file_path: str, chunk_rows: int, columns: Optional[list] = None) -> Iterator:
+    """
+    Yields pyarrow RecordBatches for Parquet/Feather files and DataFrames for CSV.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".parquet":
+        import pyarrow.parquet as pq
+        yield from pq.ParquetFile(file_path).iter_batches(batch_size=chunk_rows, columns=columns)
+    elif extension in (".feather", ".arrow"):
+        import pyarrow as pa
+        reader = pa.ipc.open_file(pa.memory_map(file_path))
+        for index in range(reader.num_record_batches):
+            batch = reader.get_batch(index)
+            batch = batch.select(columns) if columns else batch
+            for offset in range(0, batch.num_rows, chunk_rows):
+                yield batch.slice(offset, chunk_rows)
+    else:
+        yield from pd.read_csv(file_path, chunksize=chunk_rows, usecols=columns, dtype=schema_read_dtypes())
+
+
+def _column(chunk, name: str) -> np.ndarray:
+    if isinstance(chunk, pd.DataFrame):
+        return chunk[name].to_numpy()
+    return chunk.column(name).to_numpy(zero_copy_only=False)
+
+
+class ChunkWriter:
+    """
+    Appends chunks to a Parquet, Feather/Arrow or CSV file: pyarrow RecordBatches or
+    DataFrames as read by _iter_chunks, or DataFrames converted to a fixed `schema` for
+    columnar files.
+    """
+
+    def __init__(self, file_path: str, csv_export: bool = False, schema=None):
+        """
+        Args:
+            file_path (str): Destination path; an existing file is replaced.
+            csv_export (bool): Also write a .csv copy next to a columnar file.
+            schema (pyarrow.Schema, optional): Schema DataFrame chunks are converted to for
+                                               columnar files, so every chunk has the same types.
+        """
+        self.file_path = file_path
+        self.schema = schema
+        self.base_path, self.extension = os.path.splitext(file_path)
+        self.extension = self.extension.lower()
+        self.csv_export = csv_export and self.extension != ".csv"
+        self._writer = None
+        self._csv_paths_written = set()
+        self.rows = 0
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        for path in (file_path, f"{self.base_path}.csv"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _append_csv(self, dataframe: pd.DataFrame, path: str) -> None:
+        header = path not in self._csv_paths_written
+        dataframe.to_csv(path, mode="a", header=header, index=False)
+        self._csv_paths_written.add(path)
+
+    def write(self, chunk) -> None:
+        self.rows += len(chunk)
+        if isinstance(chunk, pd.DataFrame) and self.schema is not None and self.extension != ".csv":
+            import pyarrow as pa
+            chunk = pa.RecordBatch.from_pandas(chunk.reindex(columns=self.schema.names), schema=self.schema,
+                                               preserve_index=False)
+        if isinstance(chunk, pd.DataFrame):
+            self._append_csv(chunk, self.file_path)
+            return
+
+        if self._writer is None:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self.extension == ".parquet":
+                self._writer = pq.ParquetWriter(self.file_path, chunk.schema)
+            else:
+                self._writer = pa.ipc.new_file(self.file_path, chunk.schema)
+        if self.extension == ".parquet":
+            self._writer.write_batch(chunk)
+        else:
+            self._writer.write(chunk)
+        if self.csv_export:
+            self._append_csv(chunk.to_pandas(), f"{self.base_path}.csv")
+
+    def close(self, schema_source=None) -> None:
+        if self.rows == 0 and schema_source is not None:
+            # nothing was assigned to this side: still write an empty file with the columns
+            self.write(schema_source.iloc[:0] if isinstance(schema_source, pd.DataFrame) else schema_source.slice(0, 0))
+        if self._writer is not None:
+            self._writer.close()
+
+
+def split_file_by_hash(source_path: str, train_file_path: str, test_file_path: str, test_ratio: float,
+                       key_column: str, stratify_column: Optional[str] = None, chunk_rows: int = 100000,
+                       csv_export: bool = False) -> Tuple[int, int]:
+    """
+    Streams `source_path` chunk by chunk into train and test files of the same format,
+    assigning rows with a HashSplitter on `key_column`. Memory use depends on `chunk_rows`,
+    not on the size of the dataset; a stratified split reads the key and class columns
+    once more beforehand.
+
+    Returns:
+        Tuple[int, int]: Rows written to train and to test.
+    """
+    try:
+        splitter = HashSplitter(test_ratio, stratify_column)
+        if stratify_column:
+            for chunk in _iter_chunks(source_path, chunk_rows, columns=[key_column, stratify_column]):
+                splitter.observe(hash_fractions(_column(chunk, key_column)), _column(chunk, stratify_column))
+            splitter.finish_observing()
+            logging.info(f"Stratified hash split thresholds per class: {splitter.class_thresholds}")
+
+        train_writer = ChunkWriter(train_file_path, csv_export)
+        test_writer = ChunkWriter(test_file_path, csv_export)
+        last_chunk = None
+        for chunk in _iter_chunks(source_path, chunk_rows):
+            labels = _column(chunk, stratify_column) if stratify_column else None
+            test_mask = splitter.test_mask(hash_fractions(_column(chunk, key_column)), labels)
+            if isinstance(chunk, pd.DataFrame):
+                train_writer.write(chunk[~test_mask])
+                test_writer.write(chunk[test_mask])
+            else:
+                import pyarrow as pa
+                train_writer.write(chunk.filter(pa.array(~test_mask)))
+                test_writer.write(chunk.filter(pa.array(test_mask)))
+            last_chunk = chunk
+        train_writer.close(last_chunk)
+        test_writer.close(last_chunk)
+        return train_writer.rows, test_writer.rows
+
+    except Exception as e:
+        raise MyException(e, sys) from e
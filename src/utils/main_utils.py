@@ -2,10 +2,11 @@ import os
 import sys
 
 import numpy as np
-import dill
+import pandas as pd
 import yaml
 from pandas import DataFrame
 
+from src.constants import SCHEMA_FILE_PATH
 from src.exception import MyException
 from src.logger import logging
 
@@ -37,6 +38,9 @@ def load_object(file_path: str) -> object:
     file_path: str location of file to load
     return: Model/Obj
     """
+    # dill is only needed by training jobs; importing it lazily keeps it out of serving startup
+    import dill
+
     try:
         with open(file_path, "rb") as file_obj:
             obj = dill.load(file_obj)
@@ -44,6 +48,60 @@ def load_object(file_path: str) -> object:
     except Exception as e:
         raise MyException(e, sys) from e
 
+def schema_read_dtypes(schema_file_path: str = SCHEMA_FILE_PATH) -> dict:
+    """
+    Returns read_csv dtypes for the schema.yaml columns that cannot hold missing values
+    as integers: float columns as float64 and string columns as str. Integer columns are
+    left to inference since a missing value turns them into floats.
+    """
+    dtypes = {"float": "float64", "string": str}
+    columns = read_yaml_file(schema_file_path)["columns"]
+    return {name: dtypes[kind] for name, kind in columns.items() if kind in dtypes}
+
+
+def read_data_frame(file_path: str, schema_file_path: str = SCHEMA_FILE_PATH) -> DataFrame:
+    """
+    Reads a data artifact written by write_data_frame, choosing the reader by extension:
+    .parquet, .feather/.arrow, or .csv (parsed with the schema.yaml dtypes).
+    """
+    try:
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == ".parquet":
+            return pd.read_parquet(file_path)
+        if extension in (".feather", ".arrow"):
+            return pd.read_feather(file_path)
+        return pd.read_csv(file_path, dtype=schema_read_dtypes(schema_file_path))
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def write_data_frame(dataframe: DataFrame, file_path: str, csv_export: bool = False) -> None:
+    """
+    Writes a data artifact in the format given by its extension (.parquet, .feather/.arrow
+    or .csv). Columnar formats keep the column dtypes, so the next stage does not parse text.
+
+    Args:
+        dataframe (DataFrame): Data to write; its index is not stored.
+        file_path (str): Destination path.
+        csv_export (bool): Also write a .csv copy next to a columnar artifact.
+    """
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        base_path, extension = os.path.splitext(file_path)
+        extension = extension.lower()
+        if extension == ".parquet":
+            dataframe.to_parquet(file_path, index=False)
+        elif extension in (".feather", ".arrow"):
+            dataframe.reset_index(drop=True).to_feather(file_path)
+        else:
+            dataframe.to_csv(file_path, index=False, header=True)
+
+        if csv_export and extension != ".csv":
+            dataframe.to_csv(f"{base_path}.csv", index=False, header=True)
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
 def save_numpy_array_data(file_path: str, array: np.array):
     """
     Save numpy array data to file
@@ -74,6 +132,7 @@ def load_numpy_array_data(file_path: str) -> np.array:
 
 def save_object(file_path: str, obj: object) -> None:
     logging.info("Entered the save_object method of utils")
+    import dill
 
     try:
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
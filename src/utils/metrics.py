@@ -0,0 +1,184 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds in seconds; serving stages range from tens of microseconds
+# (compiled transform) to seconds (model download)
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class _Timer:
+    __slots__ = ("histogram", "label_value", "start")
+
+    def __init__(self, histogram: "Histogram", label_value: str):
+        self.histogram = histogram
+        self.label_value = label_value
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(self.label_value, time.perf_counter() - self.start)
+        return False
+
+
+class CallTimings:
+    """
+    Seconds per label value observed by one histogram within a `Histogram.collect()` block.
+    """
+    __slots__ = ("histogram", "seconds", "_token")
+
+    def __init__(self, histogram: "Histogram"):
+        self.histogram = histogram
+        self.seconds: Dict[str, float] = {}
+
+    def __enter__(self):
+        self._token = _call_timings.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _call_timings.reset(self._token)
+        return False
+
+
+# The collector of the innermost collect() block in this thread / asyncio task, if any
+_call_timings: ContextVar[Optional[CallTimings]] = ContextVar("call_timings", default=None)
+
+# Every Histogram created is exported by render_metrics
+REGISTRY: list = []
+
+
+class Histogram:
+    """
+    Minimal Prometheus-style histogram with one label, e.g. the pipeline stage.
+
+    Observing is a bisect plus three additions under a lock, cheap enough to wrap
+    every request. Counts live in the process that observed them: with the pre-fork
+    server or a process executor each process reports its own series.
+    """
+
+    def __init__(self, name: str, documentation: str, label_name: str,
+                 buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        """
+        Args:
+            name (str): Metric name, e.g. "spotify_stage_latency_seconds".
+            documentation (str): The # HELP text.
+            label_name (str): Name of the single label distinguishing series.
+            buckets (Tuple[float, ...]): Sorted bucket upper bounds; +Inf is implicit.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_name = label_name
+        self.buckets = tuple(buckets)
+        # label value -> [bucket counts (non-cumulative, last is +Inf), sum, count]
+        self._series: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, label_value: str, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+        collector = _call_timings.get()
+        if collector is not None and collector.histogram is self:
+            collector.seconds[label_value] = collector.seconds.get(label_value, 0.0) + value
+
+    def time(self, label_value: str) -> _Timer:
+        """
+        Context manager that observes the wall time of its block.
+        """
+        return _Timer(self, label_value)
+
+    def collect(self) -> CallTimings:
+        """
+        Context manager that also sums this histogram's observations made by the current
+        thread or asyncio task inside the block, e.g. to show the stage timings of one
+        call. Unlike the process-wide totals, concurrent calls do not leak into it.
+        """
+        return CallTimings(self)
+
+    def render(self) -> List[str]:
+        """
+        Returns the metric in Prometheus text exposition format, one line per item.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {label: (list(counts), total, count) for label, (counts, total, count) in self._series.items()}
+
+        for label_value, (counts, total, count) in sorted(snapshot.items()):
+            label = f'{self.label_name}="{label_value}"'
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label}}} {total}")
+            lines.append(f"{self.name}_count{{{label}}} {count}")
+        return lines
+
+
+STAGE_LATENCY = Histogram(
+    "spotify_stage_latency_seconds",
+    "Time spent in each prediction pipeline stage.",
+    label_name="stage",
+)
+
+REQUEST_LATENCY = Histogram(
+    "spotify_http_request_duration_seconds",
+    "End-to-end HTTP request time per route, until the last response byte is sent.",
+    label_name="route",
+)
+
+
+def render_metrics() -> str:
+    """
+    Returns all metrics of this process in Prometheus text format.
+    """
+    return "\n".join(line for histogram in REGISTRY for line in histogram.render()) + "\n"
+
+
+class RequestLatencyMiddleware:
+    """
+    ASGI middleware that records REQUEST_LATENCY per matched route template, so
+    path parameters and unknown URLs do not create new series. Streaming responses
+    are timed until their final body chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        recorded = False
+
+        def record() -> None:
+            nonlocal recorded
+            if not recorded:
+                recorded = True
+                route = scope.get("route")
+                REQUEST_LATENCY.observe(getattr(route, "path", "other"), time.perf_counter() - start)
+
+        async def send_and_time(message):
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_and_time)
+        finally:
+            record()
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+# config/schema.yaml and the other config paths are relative to the repository root
+os.chdir(REPO_ROOT)
+
+
+def synthetic_tracks(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Random tracks with the columns and value ranges of config/schema.yaml.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "track": [f"track {i}" for i in range(rows)],
+        "artist": [f"artist {i % 50}" for i in range(rows)],
+        "uri": [f"spotify:track:{seed}:{i:022d}" for i in range(rows)],
+        "danceability": rng.random(rows), "energy": rng.random(rows), "key": rng.integers(0, 12, rows),
+        "loudness": rng.uniform(-60, 0, rows), "mode": rng.integers(0, 2, rows),
+        "speechiness": rng.random(rows), "acousticness": rng.random(rows),
+        "instrumentalness": rng.random(rows), "liveness": rng.random(rows), "valence": rng.random(rows),
+        "tempo": rng.uniform(50, 200, rows), "duration_ms": rng.integers(60000, 400000, rows),
+        "time_signature": rng.integers(3, 6, rows), "chorus_hit": rng.uniform(0, 120, rows),
+        "sections": rng.integers(1, 30, rows), "target": rng.integers(0, 2, rows),
+    })
+
+
+@pytest.fixture(scope="session")
+def data_transformation():
+    from src.components.data_transformation import DataTransformation
+    from src.entity.config_entity import DataTransformationConfig
+
+    return DataTransformation(DataTransformationConfig(), data_ingestion_artifact=None, data_validation_artifact=None)
+
+
+@pytest.fixture(scope="session")
+def training_features(data_transformation) -> pd.DataFrame:
+    schema = data_transformation._schema_config
+    return synthetic_tracks(2000).drop(columns=schema["columns_to_drop"] + schema["target_column"])
+
+
+@pytest.fixture(scope="session")
+def fitted_preprocessor(data_transformation, training_features):
+    return data_transformation.get_data_transformer_object().fit(training_features)
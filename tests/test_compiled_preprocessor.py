@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from src.entity.compiled_preprocessor import CompiledPreprocessor
+from src.entity.estimator import MyModel
+
+from tests.conftest import synthetic_tracks
+
+
+def _dense(matrix) -> np.ndarray:
+    return matrix.toarray() if hasattr(matrix, "toarray") else np.asarray(matrix)
+
+
+def _random_rows(training_features, rows: int, seed: int):
+    """
+    Fresh rows with unseen categories and NaNs sprinkled over every column.
+    """
+    rng = np.random.default_rng(seed)
+    dataframe = synthetic_tracks(rows, seed=seed)[training_features.columns].astype(np.float64)
+    dataframe.loc[rng.random(rows) < 0.1, "key"] = 12
+    dataframe.loc[rng.random(rows) < 0.1, "mode"] = 2
+    dataframe.loc[rng.random(rows) < 0.1, "time_signature"] = rng.choice([0, 1, 7, 3.5])
+    for column in dataframe.columns:
+        dataframe.loc[rng.random(rows) < 0.05, column] = np.nan
+    return dataframe
+
+
+@pytest.fixture(scope="module")
+def compiled(fitted_preprocessor, training_features):
+    return CompiledPreprocessor.from_column_transformer(fitted_preprocessor, list(training_features.columns))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_sklearn_on_random_rows(fitted_preprocessor, training_features, compiled, seed):
+    dataframe = _random_rows(training_features, 1000, seed)
+
+    expected = _dense(fitted_preprocessor.transform(dataframe))
+    actual = compiled.transform(dataframe[compiled.input_columns].to_numpy(dtype=np.float64))
+
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_unknown_and_missing_categories_encode_to_zeros(fitted_preprocessor, training_features, compiled):
+    dataframe = training_features.iloc[:3].astype(np.float64)
+    dataframe["key"] = [12.0, np.nan, 0.5]
+
+    actual = compiled.transform(dataframe[compiled.input_columns].to_numpy(dtype=np.float64))
+    key_block = fitted_preprocessor.output_indices_["cat"]
+    key_width = len(fitted_preprocessor.named_transformers_["cat"].named_steps["encoder"].categories_[0])
+
+    assert not actual[:, key_block.start:key_block.start + key_width].any()
+    np.testing.assert_array_equal(actual, _dense(fitted_preprocessor.transform(dataframe)))
+
+
+def test_input_column_order_is_respected(fitted_preprocessor, training_features):
+    columns = list(training_features.columns)[::-1]
+    compiled = CompiledPreprocessor.from_column_transformer(fitted_preprocessor, columns)
+    dataframe = _random_rows(training_features, 200, seed=10)
+
+    np.testing.assert_array_equal(compiled.transform(dataframe[columns].to_numpy(dtype=np.float64)),
+                                  _dense(fitted_preprocessor.transform(dataframe)))
+
+
+def test_model_enables_compiled_path_only_on_parity(fitted_preprocessor, training_features):
+    model = MyModel(fitted_preprocessor, trained_model_object=None)
+    probe = _random_rows(training_features, 500, seed=20)
+
+    assert model.compile_preprocessor(probe)
+    np.testing.assert_array_equal(model.transform(probe), _dense(fitted_preprocessor.transform(probe)))
+
+
+def test_matches_rejects_a_different_preprocessor(data_transformation, fitted_preprocessor, training_features, compiled):
+    refitted = data_transformation.get_data_transformer_object().fit(training_features.iloc[:100])
+
+    assert compiled.matches(fitted_preprocessor, training_features)
+    assert not compiled.matches(refitted, training_features)
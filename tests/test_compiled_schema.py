@@ -0,0 +1,46 @@
+import numpy as np
+
+from src.entity.compiled_schema import load_compiled_schema
+from src.pipline.prediction_pipeline import SpotifyBatch
+
+from tests.conftest import synthetic_tracks
+
+
+def test_model_inputs_use_the_serving_dtypes():
+    schema = load_compiled_schema()
+    compact = schema.apply(synthetic_tracks(500))
+    assert compact["danceability"].dtype == np.float32
+
+    widened = schema.model_inputs(compact)
+    for name, dtype in SpotifyBatch.feature_dtypes.items():
+        assert widened[name].dtype == dtype, name
+
+
+def test_model_inputs_keep_missing_integers_as_float64():
+    schema = load_compiled_schema()
+    tracks = synthetic_tracks(100).astype({"key": np.float64})
+    tracks.loc[3, "key"] = np.nan
+
+    widened = schema.model_inputs(schema.apply(tracks))
+    assert widened["key"].dtype == np.float64
+    assert np.isnan(widened.loc[3, "key"])
+
+
+def test_preprocessor_output_matches_serving_dtypes(data_transformation, training_features):
+    schema = load_compiled_schema()
+    compact = schema.apply(training_features)
+    preprocessor = data_transformation.get_data_transformer_object().fit(schema.model_inputs(compact))
+
+    served = SpotifyBatch.from_dataframe(schema.model_inputs(compact)).to_dataframe()
+    np.testing.assert_array_equal(preprocessor.transform(schema.model_inputs(compact)),
+                                  preprocessor.transform(served))
+
+
+def test_model_inputs_narrow_whole_float_integers():
+    # Streamed ingestion stores int columns as float64
+    tracks = synthetic_tracks(100).astype({"key": np.float64, "mode": np.float64})
+    tracks.loc[3, "mode"] = np.nan
+
+    widened = load_compiled_schema().model_inputs(tracks)
+    assert widened["key"].dtype == np.int64
+    assert widened["mode"].dtype == np.float64
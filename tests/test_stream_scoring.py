@@ -0,0 +1,86 @@
+import http.client
+import io
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import uvicorn
+
+from tests.conftest import synthetic_tracks
+
+
+@pytest.fixture(scope="module")
+def server_port():
+    """
+    The real app behind uvicorn, so the upload goes through uvicorn's ASGI receive
+    channel, with a scorer that labels every track 0.
+    """
+    import app
+
+    async def score_zeros(dataframe):
+        return np.zeros(len(dataframe), dtype=np.int64), np.zeros(len(dataframe))
+
+    patch = pytest.MonkeyPatch()
+    patch.setattr(app, "score_upload_chunk", score_zeros)
+    server = uvicorn.Server(uvicorn.Config(app.app, host="127.0.0.1", port=0, lifespan="off",
+                                          log_level="warning", timeout_graceful_shutdown=5))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    yield server.servers[0].sockets[0].getsockname()[1]
+    server.should_exit = True
+    thread.join()
+    patch.undo()
+
+
+def post(port, body, content_type, chunked=False):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    if chunked:
+        payload = (body[i:i + 65536] for i in range(0, len(body), 65536))
+    else:
+        payload = body
+    connection.request("POST", "/predict/stream", body=payload, headers={"content-type": content_type},
+                       encode_chunked=chunked)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_streamed_upload_scores_every_row(server_port, chunked):
+    tracks = synthetic_tracks(50000)
+    status, body = post(server_port, tracks.to_csv(index=False).encode(), "text/csv", chunked=chunked)
+
+    assert status == 200
+    output = pd.read_csv(io.BytesIO(body))
+    assert len(output) == len(tracks)
+    assert output["row"].tolist() == list(range(len(tracks)))
+    assert output["uri"].tolist() == tracks["uri"].tolist()
+    assert output["error"].isna().all()
+
+
+def test_malformed_json_line_fails_only_its_row(server_port):
+    lines = synthetic_tracks(20).to_json(orient="records", lines=True).encode().splitlines()
+    lines.insert(5, b"{bad json")
+    status, body = post(server_port, b"\n".join(lines), "application/x-ndjson")
+
+    assert status == 200
+    output = pd.read_json(io.BytesIO(body), lines=True)
+    assert len(output) == 21
+    assert output.loc[5, "error"].startswith("invalid JSON")
+    assert output.drop(index=5)["error"].isna().all()
+
+
+def test_ragged_csv_row_fails_only_its_row(server_port):
+    lines = synthetic_tracks(20).to_csv(index=False).encode().splitlines()
+    lines.insert(6, b"1,2,3")
+    lines.insert(9, b'"unterminated,1,2')
+    status, body = post(server_port, b"\n".join(lines), "text/csv")
+
+    assert status == 200
+    output = pd.read_csv(io.BytesIO(body))
+    assert len(output) == 22
+    assert output.loc[[5, 8], "error"].str.startswith("invalid CSV row").all()
+    assert output.drop(index=[5, 8])["error"].isna().all()
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.entity.estimator import MyModel
+from src.entity.tree_ensemble import XGBOOST_PROBA_ATOL, FlatTreeEnsemble
+
+from tests.conftest import synthetic_tracks
+
+
+@pytest.fixture(scope="module")
+def training_data(fitted_preprocessor, training_features):
+    # A learnable target, so the trees are deep and the probabilities spread out
+    targets = ((training_features["danceability"] + training_features["energy"]) > 1.0).astype(int)
+    flipped = np.random.default_rng(1).random(len(targets)) < 0.1
+    return fitted_preprocessor.transform(training_features), np.where(flipped, 1 - targets, targets)
+
+
+@pytest.fixture(scope="module")
+def scoring_features(fitted_preprocessor, training_features):
+    dataframe = synthetic_tracks(5000, seed=7)[training_features.columns].astype(np.float64)
+    dataframe.loc[np.random.default_rng(8).random(len(dataframe)) < 0.05, "tempo"] = np.nan
+    return fitted_preprocessor.transform(dataframe)
+
+
+@pytest.mark.parametrize("missing_in_training", [False, True])
+def test_random_forest_is_bit_for_bit(training_data, scoring_features, missing_in_training):
+    features, targets = training_data
+    if missing_in_training:
+        # Trained with missing values, so splits learn which side they go to
+        features = features.copy()
+        features[np.random.default_rng(9).random(features.shape) < 0.05] = np.nan
+    model = RandomForestClassifier(n_estimators=50, max_depth=12, random_state=42).fit(features, targets)
+    ensemble = FlatTreeEnsemble.from_model(model)
+
+    assert np.isnan(scoring_features).any()
+    assert np.array_equal(ensemble.predict_proba(scoring_features), model.predict_proba(scoring_features))
+    assert np.array_equal(ensemble.predict(scoring_features), model.predict(scoring_features))
+    assert ensemble.matches(model, scoring_features)
+
+
+def test_xgboost_labels_match_and_probabilities_are_bounded(training_data, scoring_features):
+    xgboost = pytest.importorskip("xgboost")
+    model = xgboost.XGBClassifier(n_estimators=150, max_depth=6, learning_rate=0.1, random_state=42)
+    model.fit(*training_data)
+    ensemble = FlatTreeEnsemble.from_model(model)
+
+    assert np.array_equal(ensemble.predict(scoring_features), model.predict(scoring_features))
+    difference = np.abs(ensemble.predict_proba(scoring_features) - model.predict_proba(scoring_features))
+    assert difference.max() <= XGBOOST_PROBA_ATOL
+    assert ensemble.matches(model, scoring_features)
+
+
+def test_model_flattens_only_supported_estimators(fitted_preprocessor, training_features, training_data):
+    probe = training_features.iloc[:500]
+    forest = RandomForestClassifier(n_estimators=10, random_state=0).fit(*training_data)
+    assert MyModel(fitted_preprocessor, forest).flatten_trained_model(probe)
+
+    from sklearn.dummy import DummyClassifier
+    model = MyModel(fitted_preprocessor, DummyClassifier().fit(*training_data))
+    assert not model.flatten_trained_model(probe)
+    assert model.flat_tree_ensemble is None
@@ -0,0 +1,31 @@
+import msgpack
+import pytest
+
+from src.pipline import wire_formats
+from src.pipline.prediction_pipeline import SpotifyBatch
+
+from tests.conftest import synthetic_tracks
+
+
+def columnar_body(rows: int, **extra) -> bytes:
+    tracks = synthetic_tracks(rows)
+    return msgpack.packb({**{name: tracks[name].tolist() for name in SpotifyBatch.feature_names}, **extra})
+
+
+def test_msgpack_uris_are_returned_per_track():
+    batch, uris = wire_formats.decode_msgpack(columnar_body(3, uri=["a", None, "c"]))
+    assert len(batch) == 3
+    assert uris == ["a", None, "c"]
+
+
+@pytest.mark.parametrize("uri", ["abc", ["a", "b"], [1, 2, 3]])
+def test_msgpack_rejects_uris_not_matching_the_tracks(uri):
+    with pytest.raises(ValueError, match="'uri'"):
+        wire_formats.decode_msgpack(columnar_body(3, uri=uri))
+
+
+def test_msgpack_rejects_non_string_uri_in_rows():
+    tracks = synthetic_tracks(3).to_dict("records")
+    tracks[1]["uri"] = 5
+    with pytest.raises(ValueError, match="'uri'"):
+        wire_formats.decode_msgpack(msgpack.packb({"tracks": tracks}))